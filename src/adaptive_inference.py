@@ -0,0 +1,115 @@
+# src/adaptive_inference.py
+import math
+import time
+
+from finger_tracking import HandResult
+
+
+class AdaptiveInferenceScheduler:
+    """
+    Runs FingerTracker inference only every k-th frame and predicts the
+    fingertip in between with a constant-velocity model over
+    FingerMotionController.history.
+
+    k is re-derived after every inference:
+    - cost: k grows until inference uses at most cpu_budget of the frame time
+    - motion: a still hand doubles k, a fast-moving hand forces k down to 1
+    Same process(frame) -> HandResult interface as FingerTracker, so it can be
+    used wherever a tracker is expected. `clock` must match the controller's
+    clock since predictions extrapolate from its history timestamps.
+    """
+    def __init__(self, tracker, controller, cpu_budget=0.5, max_skip=6,
+                 still_speed=80.0, fast_speed=900.0, max_predict=0.25, clock=time.monotonic):
+        self.tracker = tracker
+        self.controller = controller
+        self.cpu_budget = cpu_budget
+        self.max_skip = max_skip
+        self.still_speed = still_speed  # px/s
+        self.fast_speed = fast_speed    # px/s
+        self.max_predict = max_predict  # s; stop extrapolating after this long without inference
+        self.clock = clock
+
+        self.k = 1
+        self.frames_since = 0
+        self.cost = 0.0      # EMA of inference seconds
+        self.frame_dt = None  # EMA of seconds between frames
+        self.last_frame_t = None
+        self.last_result = HandResult()
+        self.last_infer_t = None
+        self.frames = 0
+        self.inferences = 0
+
+    def _velocity(self):
+        """Velocity (px/s) over the controller history, or None if too short."""
+        history = self.controller.history
+        if len(history) < 2:
+            return None
+        x0, y0, t0 = history[0]
+        x1, y1, t1 = history[-1]
+        dt = t1 - t0
+        if dt <= 0:
+            return None
+        return (x1 - x0) / dt, (y1 - y0) / dt
+
+    def _update_k(self):
+        if not self.frame_dt:
+            self.k = 1
+            return
+        k = max(1, math.ceil(self.cost / (self.cpu_budget * self.frame_dt)))
+        v = self._velocity()
+        speed = math.hypot(*v) if v else 0.0
+        if speed >= self.fast_speed:
+            k = 1
+        elif speed <= self.still_speed:
+            k *= 2
+        self.k = min(self.max_skip, k)
+
+    def _predict(self, frame, now):
+        last = self.last_result
+        if last.fingertip is None or now - self.last_infer_t > self.max_predict:
+            return HandResult(None, last.landmarks, last.open_palm, predicted=True, gestures=last.gestures)
+        v = self._velocity()
+        x, y, t = self.controller.history[-1] if self.controller.history else (*last.fingertip, self.last_infer_t)
+        if v is not None:
+            dt = now - t
+            x, y = x + v[0] * dt, y + v[1] * dt
+        h, w = frame.shape[:2]
+        x = int(min(max(x, 0), w - 1))
+        y = int(min(max(y, 0), h - 1))
+        return HandResult((x, y), last.landmarks, last.open_palm, predicted=True, gestures=last.gestures)
+
+    def process(self, frame):
+        now = self.clock()
+        if self.last_frame_t is not None:
+            dt = now - self.last_frame_t
+            self.frame_dt = dt if self.frame_dt is None else 0.9 * self.frame_dt + 0.1 * dt
+        self.last_frame_t = now
+        self.frames += 1
+
+        if self.frames_since + 1 < self.k and self.last_infer_t is not None:
+            self.frames_since += 1
+            return self._predict(frame, now)
+
+        t0 = time.perf_counter()
+        result = self.tracker.process(frame)
+        cost = time.perf_counter() - t0
+        self.cost = cost if self.inferences == 0 else 0.8 * self.cost + 0.2 * cost
+        self.inferences += 1
+        self.frames_since = 0
+        self.last_result = result
+        self.last_infer_t = now
+        self._update_k()
+        return result
+
+    def load(self):
+        self.tracker.load()
+        return self
+
+    def speedup_report(self):
+        report = self.tracker.speedup_report()
+        report["inference_ratio"] = self.inferences / self.frames if self.frames else 1.0
+        report["k"] = self.k
+        return report
+
+    def draw_hands(self, frame, hand_landmarks):
+        return self.tracker.draw_hands(frame, hand_landmarks)
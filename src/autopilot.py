@@ -0,0 +1,243 @@
+# src/autopilot.py
+import argparse
+import collections
+import random
+import time
+
+from snake_game import OPPOSITE, SnakeGame
+
+_TABLES = {}  # grid_size -> (neighbors, cycle_index, cycle_dir, total)
+
+
+def hamiltonian_directions(n):
+    """
+    Direction to take from every cell of an n x n board (n even) so the snake
+    follows a Hamiltonian cycle and never dies: row 0 left-to-right, a
+    serpentine over columns 1..n-1, then back up column 0.
+    """
+    dirs = {}
+    for y in range(n):
+        for x in range(n):
+            if y == 0:
+                d = "RIGHT" if x < n - 1 else "DOWN"
+            elif x == 0:
+                d = "UP"
+            elif y % 2:  # odd rows move left
+                d = "LEFT" if x > 1 or y == n - 1 else "DOWN"
+            else:
+                d = "RIGHT" if x < n - 1 else "DOWN"
+            dirs[(x, y)] = d
+    return dirs
+
+
+def odd_cycle(n):
+    """
+    Cells of a cycle through every cell of an n x n board (n odd, n >= 3)
+    except the corner (0, 0): row 0 from x=1, a serpentine down and up columns
+    n-1..2, then two columns zigzagging back up to (0, 1) -> (1, 1) -> (1, 0).
+    (0, 0) and (1, 1) touch both (0, 1) and (1, 0), so either can take the
+    last position of the cycle: that swap is how the corner gets visited.
+    """
+    cells = [(x, 0) for x in range(1, n)]
+    for i, x in enumerate(range(n - 1, 1, -1)):
+        ys = range(1, n) if i % 2 == 0 else range(n - 1, 0, -1)
+        cells.extend((x, y) for y in ys)
+    for y in range(n - 1, 0, -1):
+        cells.extend([(1, y), (0, y)] if (n - 1 - y) % 2 == 0 else [(0, y), (1, y)])
+    return cells
+
+
+def _tables(n):
+    """
+    Per-board-size tables, built once and shared by every AutopilotController:
+    - neighbors[cell]: ((direction, cell), ...) for in-bounds moves
+    - cycle_index[cell]: position on the cycle; on odd boards the corner
+      (0, 0) shares the last position with (1, 1) (see odd_cycle)
+    - cycle_dir[cell]: direction to the next position on the cycle
+    - total: number of positions on the cycle (n*n, or n*n - 1 if n is odd)
+    """
+    tables = _TABLES.get(n)
+    if tables is not None:
+        return tables
+    neighbors = []
+    for cell in range(n * n):
+        x, y = cell % n, cell // n
+        moves = []
+        if y > 0:
+            moves.append(("UP", cell - n))
+        if y < n - 1:
+            moves.append(("DOWN", cell + n))
+        if x > 0:
+            moves.append(("LEFT", cell - 1))
+        if x < n - 1:
+            moves.append(("RIGHT", cell + 1))
+        neighbors.append(tuple(moves))
+
+    if n % 2 == 0:
+        dirs = hamiltonian_directions(n)
+        step = {"UP": (0, -1), "DOWN": (0, 1), "LEFT": (-1, 0), "RIGHT": (1, 0)}
+        order = [(0, 0)]
+        for _ in range(n * n - 1):
+            x, y = order[-1]
+            dx, dy = step[dirs[(x, y)]]
+            order.append((x + dx, y + dy))
+    else:
+        order = odd_cycle(n) if n > 1 else [(0, 0)]
+    total = len(order)
+    cycle_index = [0] * (n * n)
+    cycle_dir = [None] * (n * n)
+    for i, (x, y) in enumerate(order):
+        cycle_index[y * n + x] = i
+        cycle_dir[y * n + x] = _direction((x, y), order[(i + 1) % total])
+    if total < n * n:
+        cycle_index[0] = total - 1
+        cycle_dir[0] = _direction((0, 0), order[0])
+
+    tables = _TABLES[n] = (neighbors, cycle_index, cycle_dir, total)
+    return tables
+
+
+def _direction(a, b):
+    dx, dy = b[0] - a[0], b[1] - a[1]
+    return {(0, -1): "UP", (0, 1): "DOWN", (-1, 0): "LEFT", (1, 0): "RIGHT"}.get((dx, dy))
+
+
+def _free_move(moves, occupied, banned, default):
+    """First move onto a free cell that is not a reversal, else default."""
+    for name, cell in moves:
+        if name != banned and not occupied[cell]:
+            return name
+    return default
+
+
+class AutopilotController:
+    """
+    Plays a SnakeGame on its own (attract mode, soak and load tests).
+    Same get_direction()/last_direction/history/reset() interface as the finger
+    controllers: the fingertip is ignored and the direction is planned from the
+    game state. For exact per-step control pass steer as GameClock's before_step.
+
+    Follows a precomputed Hamiltonian cycle, taking shortcuts towards the food
+    that never jump past the tail. The body then always lies in cycle order, so
+    every cell between head and tail along the cycle is free and the snake can
+    never trap itself; each step is O(1) table lookups. Shortcuts stop once the
+    snake fills shortcut_fill of the board.
+    Odd boards have no Hamiltonian cycle: the cycle skips one corner, which
+    shares a position with its diagonal neighbour and is swapped in whenever
+    the food is there (see odd_cycle), so those games are won too.
+    """
+    def __init__(self, game, shortcut_fill=0.5, clock=time.monotonic):
+        self.game = game
+        self.shortcut_fill = shortcut_fill
+        self.clock = clock
+        self.history = collections.deque(maxlen=4)  # (x,y,t), unused: no fingertip
+        self.reset()
+
+    def reset(self):
+        self.last_direction = "RIGHT"
+
+    def get_direction(self, fingertip=None, t=None):
+        self.last_direction = self.plan()
+        return self.last_direction
+
+    def steer(self, game):
+        """before_step hook: point the game at the planned direction."""
+        game.change_direction(self.get_direction())
+
+    def plan(self):
+        """Direction for the next step of self.game."""
+        game = self.game
+        neighbors, cycle_index, cycle_dir, total = _tables(game.grid_size)
+        return self._plan_cycle(game, neighbors, cycle_index, cycle_dir, total)
+
+    def _plan_cycle(self, game, neighbors, cycle_index, cycle_dir, total):
+        n = game.grid_size
+        occupied = game.occupied
+        hx, hy = game.snake[0]
+        head = hy * n + hx
+        hi = cycle_index[head]
+        banned = OPPOSITE[game.last_moved_direction]  # the engine refuses reversals
+
+        food = None
+        if game.food is not None:
+            fx, fy = game.food
+            food = fy * n + fx
+            food_ahead = (cycle_index[food] - hi) % total
+        else:
+            food_ahead = total
+
+        if len(game.snake) == 1:
+            # nothing to keep in order yet: any legal move, closest to the food along the
+            # cycle, but not onto the cycle cell just before the head (after eating, the
+            # tail would then sit right ahead and the only way on would be a reversal)
+            best, best_key = None, None
+            for name, cell in neighbors[head]:
+                ahead = (cycle_index[cell] - hi) % total
+                if name == banned or ahead == total - 1:
+                    continue
+                key = (food_ahead - ahead) % total
+                if best_key is None or key < best_key:
+                    best, best_key = name, key
+            return best or _free_move(neighbors[head], occupied, banned, cycle_dir[head])
+
+        tx, ty = game.snake[-1]
+        tail_ahead = (cycle_index[ty * n + tx] - hi) % total
+        limit = min(tail_ahead - 1, food_ahead)
+        if len(game.snake) >= self.shortcut_fill * total:
+            limit = min(limit, 1)
+
+        best, best_ahead = None, 0
+        for name, cell in neighbors[head]:
+            if name == banned:
+                continue
+            if cell == food and food_ahead == 1:
+                # the next position, so always in order; on odd boards this is how the
+                # spare cell gets eaten, even with the tail in the other cell there
+                return name
+            if occupied[cell]:
+                continue
+            ahead = (cycle_index[cell] - hi) % total
+            if ahead == food_ahead and cell != food:
+                continue  # the other cell at the food's position would pass the food by
+            if best_ahead < ahead <= limit:
+                best, best_ahead = name, ahead
+        if best is None:
+            best = cycle_dir[head]
+            if best == banned:  # only on tiny boards where the neck is the next cycle cell
+                best = _free_move(neighbors[head], occupied, banned, best)
+        return best
+
+
+def play(grid_size=20, seed=0, max_steps=None):
+    """Run one autopilot game to the end; returns the finished SnakeGame and its step count."""
+    game = SnakeGame(grid_size, rng=random.Random(seed))
+    pilot = AutopilotController(game)
+    max_steps = max_steps or 50 * grid_size ** 4
+    steps = 0
+    while not game.game_over and steps < max_steps:
+        pilot.steer(game)
+        game.step()
+        steps += 1
+    return game, steps
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run autopilot games headless and report throughput.")
+    parser.add_argument("--games", type=int, default=20)
+    parser.add_argument("--grid", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    t0 = time.perf_counter()
+    total_steps = wins = 0
+    for g in range(args.games):
+        game, steps = play(args.grid, args.seed + g)
+        total_steps += steps
+        wins += game.won
+    elapsed = time.perf_counter() - t0
+    print(f"{args.games} games on {args.grid}x{args.grid}: {wins} won, "
+          f"{total_steps} steps in {elapsed:.2f}s ({total_steps / elapsed:.0f} steps/s, {args.games / elapsed:.1f} games/s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,174 @@
+# src/batch_engine.py
+import random
+
+import numpy as np
+
+from snake_game import DIRECTIONS, MOVES, SnakeGame
+
+DX = np.array([MOVES[d][0] for d in DIRECTIONS], dtype=np.int32)
+DY = np.array([MOVES[d][1] for d in DIRECTIONS], dtype=np.int32)
+
+
+class BatchSnakeGame:
+    """
+    Headless engine stepping N snake games in lockstep with NumPy arrays.
+    Same rules as SnakeGame (walls, tail chasing, growth, board-full win),
+    but directions are integer codes (index into snake_game.DIRECTIONS).
+
+    Per-game state (first axis is the game index):
+    - body: ring buffer of cell ids (y*grid_size+x), head at body[g, head_idx[g]]
+    - occupied / free_cells / free_pos: same O(1) occupancy + free-cell index as SnakeGame
+    - food: cell id or -1, alive = ~game_over
+    Food placement uses one random.Random per game, drawn exactly like
+    SnakeGame.spawn_food(), so a batch seeded like a set of scalar games
+    reproduces them move for move.
+    """
+    def __init__(self, num_games, grid_size=20, seeds=None):
+        self.num_games = num_games
+        self.grid_size = grid_size
+        if seeds is None:
+            seeds = range(num_games)
+        self.rngs = [random.Random(s) for s in seeds]
+        self.reset()
+
+    def reset(self):
+        N, n = self.num_games, self.grid_size
+        cells = n * n
+        self.body = np.zeros((N, cells), dtype=np.int32)
+        self.head_idx = np.zeros(N, dtype=np.int32)
+        self.length = np.zeros(N, dtype=np.int32)
+        self.occupied = np.zeros((N, cells), dtype=np.uint8)
+        self.free_cells = np.tile(np.arange(cells, dtype=np.int32), (N, 1))
+        self.free_pos = self.free_cells.copy()
+        self.free_count = np.full(N, cells, dtype=np.int32)
+        self.direction = np.full(N, DIRECTIONS.index("RIGHT"), dtype=np.int8)
+        self.last_moved = self.direction.copy()
+        self.score = np.zeros(N, dtype=np.int32)
+        self.game_over = np.zeros(N, dtype=bool)
+        self.won = np.zeros(N, dtype=bool)
+        self.food = np.full(N, -1, dtype=np.int32)
+
+        mid = n // 2
+        games = np.arange(N)
+        self._push_head(games, np.full(N, mid * n + mid, dtype=np.int32))
+        self._spawn_food(games)
+
+    def _push_head(self, games, cells):
+        self.head_idx[games] = (self.head_idx[games] + 1) % self.body.shape[1]
+        self.body[games, self.head_idx[games]] = cells
+        self.length[games] += 1
+        # swap-remove from the free-cell index
+        self.occupied[games, cells] = 1
+        i = self.free_pos[games, cells]
+        self.free_count[games] -= 1
+        last = self.free_cells[games, self.free_count[games]]
+        self.free_cells[games, i] = last
+        self.free_pos[games, last] = i
+        self.free_pos[games, cells] = -1
+
+    def _pop_tail(self, games, cells):
+        self.length[games] -= 1
+        self.occupied[games, cells] = 0
+        self.free_pos[games, cells] = self.free_count[games]
+        self.free_cells[games, self.free_count[games]] = cells
+        self.free_count[games] += 1
+
+    def _spawn_food(self, games):
+        # only games that just ate get here, so a Python loop is fine
+        for g in games.tolist():
+            count = int(self.free_count[g])
+            if count == 0:
+                self.food[g] = -1
+                self.won[g] = True
+                self.game_over[g] = True
+            else:
+                self.food[g] = self.free_cells[g, self.rngs[g].randrange(count)]
+
+    def heads(self):
+        return self.body[np.arange(self.num_games), self.head_idx]
+
+    def tails(self):
+        cells = self.body.shape[1]
+        return self.body[np.arange(self.num_games), (self.head_idx - self.length + 1) % cells]
+
+    def change_direction(self, actions):
+        """actions: int array of direction codes, one per game (-1 = keep)."""
+        actions = np.asarray(actions)
+        ok = (actions >= 0) & (actions != (self.last_moved ^ 1))
+        self.direction = np.where(ok, actions, self.direction).astype(np.int8)
+
+    def step(self, actions=None):
+        if actions is not None:
+            self.change_direction(actions)
+
+        n = self.grid_size
+        games = np.flatnonzero(~self.game_over)
+        if games.size == 0:
+            return
+        self.last_moved[games] = self.direction[games]
+
+        d = self.direction[games]
+        head = self.heads()[games]
+        nx = head % n + DX[d]
+        ny = head // n + DY[d]
+
+        # wall collision
+        wall = (nx < 0) | (nx >= n) | (ny < 0) | (ny >= n)
+        self.game_over[games[wall]] = True
+        games, nx, ny = games[~wall], nx[~wall], ny[~wall]
+        new_cell = ny * n + nx
+
+        # self collision: moving into the tail is safe unless we grow this step
+        eating = new_cell == self.food[games]
+        tail = self.tails()[games]
+        hit = self.occupied[games, new_cell].astype(bool) & (eating | (new_cell != tail))
+        self.game_over[games[hit]] = True
+        games, new_cell, eating, tail = games[~hit], new_cell[~hit], eating[~hit], tail[~hit]
+
+        # move
+        self._pop_tail(games[~eating], tail[~eating])
+        self._push_head(games, new_cell)
+
+        # food?
+        eaters = games[eating]
+        self.score[eaters] += 10
+        self._spawn_food(eaters)
+
+    def snake(self, g):
+        """Body of game g as a list of (x,y), head first (same as list(SnakeGame.snake))."""
+        cells = self.body.shape[1]
+        idx = (self.head_idx[g] - np.arange(self.length[g])) % cells
+        n = self.grid_size
+        return [(int(c % n), int(c // n)) for c in self.body[g, idx]]
+
+    def food_xy(self, g):
+        c = int(self.food[g])
+        return None if c < 0 else (c % self.grid_size, c // self.grid_size)
+
+
+def check_consistency(num_games=64, grid_size=8, steps=400, seed=0):
+    """
+    Run BatchSnakeGame and one SnakeGame per game with the same seeds and random
+    actions, and assert identical snake, food, score and outcome after every step.
+    """
+    batch = BatchSnakeGame(num_games, grid_size, seeds=[seed + g for g in range(num_games)])
+    games = [SnakeGame(grid_size, rng=random.Random(seed + g)) for g in range(num_games)]
+    actions_rng = np.random.default_rng(seed)
+
+    for t in range(steps):
+        actions = actions_rng.integers(0, len(DIRECTIONS), size=num_games)
+        batch.step(actions)
+        for g, game in enumerate(games):
+            game.change_direction(DIRECTIONS[actions[g]])
+            game.step()
+            state = (list(game.snake), game.food, game.score, game.game_over, game.won)
+            got = (batch.snake(g), batch.food_xy(g), int(batch.score[g]),
+                   bool(batch.game_over[g]), bool(batch.won[g]))
+            assert state == got, f"game {g} diverged at step {t}: {state} != {got}"
+    return True
+
+
+if __name__ == "__main__":
+    for size in (2, 4, 8, 20):
+        check_consistency(grid_size=size)
+    print("BatchSnakeGame matches SnakeGame")
@@ -0,0 +1,396 @@
+# src/benchmark.py
+import argparse
+import json
+import math
+import random
+import sys
+import time
+import tracemalloc
+
+import cv2
+import numpy as np
+
+from autopilot import AutopilotController, hamiltonian_directions
+from batch_engine import BatchSnakeGame
+from controller import FingerMotionController, FilteredMotionController
+from frame_io import SyntheticSource
+from frame_pool import ScratchBuffers
+from pipeline import CaptureThread
+from snake_game import DIRECTIONS, SnakeGame
+from ui_overlay import UIOverlay
+
+RESOLUTIONS = {"480p": (480, 640), "720p": (720, 1280), "1080p": (1080, 1920)}
+
+
+def measure(fn, min_time=0.5, min_iters=20, max_iters=200000, setup=None):
+    """
+    Call fn repeatedly; returns dict with throughput (calls/s) and p50/p95/p99
+    latency (us). setup() runs before each call and is not timed.
+    """
+    samples = []
+    clock = time.perf_counter
+    start = clock()
+    while len(samples) < max_iters:
+        if setup is not None:
+            setup()
+        t0 = clock()
+        fn()
+        samples.append(clock() - t0)
+        if len(samples) >= min_iters and clock() - start >= min_time:
+            break
+    lat = np.array(samples) * 1e6
+    return {
+        "n": len(samples),
+        "throughput": len(samples) / lat.sum() * 1e6,
+        "p50_us": float(np.percentile(lat, 50)),
+        "p95_us": float(np.percentile(lat, 95)),
+        "p99_us": float(np.percentile(lat, 99)),
+    }
+
+
+def long_snake_game(grid_size, fill=0.5, seed=0):
+    """A game on a Hamiltonian cycle grown to `fill` of the board, and its direction table."""
+    dirs = hamiltonian_directions(grid_size)
+    game = SnakeGame(grid_size, rng=random.Random(seed))
+    target = int(fill * grid_size * grid_size)
+    while len(game.snake) < target:
+        game.change_direction(dirs[game.snake[0]])
+        # place food right in front of the head to grow quickly
+        x, y = game.snake[0]
+        d = game.direction
+        ahead = (x + (d == "RIGHT") - (d == "LEFT"), y + (d == "DOWN") - (d == "UP"))
+        if not game.is_occupied(*ahead):
+            game.food = ahead
+        game.step()
+    game.spawn_food()
+    return game, dirs
+
+
+def bench_engine(results, args):
+    for grid, fill in ((20, 0.5), (64, 0.5), (128, 0.9)):
+        game, dirs = long_snake_game(grid, fill)
+        name = f"engine.step grid={grid} fill={fill}"
+
+        def step():
+            game.change_direction(dirs[game.snake[0]])
+            game.step()
+            if game.game_over:
+                game.reset()
+        results[name] = measure(step, args.min_time)
+
+    for n in (64, 1024):
+        batch = BatchSnakeGame(n, 20)
+        rng = np.random.default_rng(0)
+
+        def batch_step():
+            batch.step(rng.integers(0, len(DIRECTIONS), size=n))
+            if batch.game_over.all():
+                batch.reset()
+        results[f"engine.batch_step games={n}"] = measure(batch_step, args.min_time)
+
+
+def bench_controller(results, args):
+    for cls in (FingerMotionController, FilteredMotionController):
+        now = [0.0]
+        ctrl = cls(clock=lambda: now[0])
+        i = [0]
+
+        def get_direction():
+            i[0] += 1
+            now[0] += 1 / 30
+            ctrl.get_direction((320 + 200 * math.cos(i[0] / 15), 240 + 150 * math.sin(i[0] / 11)))
+        results[f"controller.{cls.__name__}"] = measure(get_direction, args.min_time)
+
+
+def bench_autopilot(results, args):
+    for grid, fill in ((20, 0.1), (20, 0.6), (64, 0.5), (21, 0.3)):
+        if grid % 2:
+            game = SnakeGame(grid, rng=random.Random(0))
+        else:
+            game, _ = long_snake_game(grid, fill)
+        pilot = AutopilotController(game)
+
+        def step():
+            pilot.steer(game)
+            game.step()
+            if game.game_over:
+                game.reset()
+        results[f"autopilot.step grid={grid} fill={fill if grid % 2 == 0 else 0}"] = measure(step, args.min_time)
+
+
+def bench_spectator(results, args):
+    """Cost of publishing a step to the spectator server (game-loop side) with one subscriber attached."""
+    import asyncio
+    import threading
+    from spectator import SpectatorClient, SpectatorServer
+
+    server = SpectatorServer(port=0).start()
+    client = SpectatorClient()
+    # a slow spectator, so the outbox overflows and resyncs during the run
+    threading.Thread(target=lambda: asyncio.run(client.run("127.0.0.1", server.port, delay=0.001)),
+                     daemon=True).start()
+    game, _ = long_snake_game(20, 0.1)
+    pilot = AutopilotController(game)
+    server.reset(game)
+
+    def step():
+        pilot.steer(game)
+        game.step()
+        if game.game_over:
+            game.reset()
+
+    def publish():
+        step()
+        server.record(game)
+    try:
+        results["spectator.step (no publish)"] = measure(step, args.min_time)
+        results["spectator.step + publish"] = measure(publish, args.min_time)
+    finally:
+        server.stop()
+
+
+def bench_gestures(results, args):
+    from finger_tracking import GestureEngine, classify
+
+    # an upright open hand, drifting sideways so swipes fire now and then
+    lm = np.zeros((21, 3), dtype=np.float32)
+    lm[:, 0] = np.linspace(0.35, 0.65, 21)
+    lm[:, 1] = 0.8 - 0.4 * (np.arange(21) % 4) / 3
+    engine = GestureEngine()
+    t = [0.0]
+
+    def update():
+        t[0] += 1 / 30
+        lm[:, 0] += 0.02 if int(t[0]) % 2 else -0.02
+        engine.update(lm, 640, 480, t[0])
+    results["gestures.classify"] = measure(lambda: classify(lm, 640, 480), args.min_time)
+    results["gestures.update"] = measure(update, args.min_time)
+
+
+def synthetic_frames(h, w, count=8, seed=0):
+    rng = np.random.default_rng(seed)
+    base = rng.integers(0, 256, size=(h, w, 3), dtype=np.uint8)
+    return [np.roll(base, k * 7, axis=1) for k in range(count)]
+
+
+def bench_tracker(results, args):
+    try:
+        from finger_tracking import FingerTracker
+        tracker = FingerTracker().load()
+    except Exception as e:  # mediapipe missing or without the Hands solution
+        print(f"tracker: skipped ({e})", file=sys.stderr)
+        return
+
+    sources = {}
+    if args.frames:
+        from recording import decode_frame, load_session
+        _, events = load_session(args.frames)
+        frames = [f for f in map(decode_frame, events) if f is not None]
+        if frames:
+            sources["recorded"] = frames
+    for name, (h, w) in RESOLUTIONS.items():
+        sources[name] = synthetic_frames(h, w)
+
+    for name, frames in sources.items():
+        i = [0]
+
+        def process():
+            i[0] += 1
+            tracker.process(frames[i[0] % len(frames)])
+        results[f"tracker.process {name}"] = measure(process, args.min_time, min_iters=5)
+
+
+def bench_renderer(results, args):
+    game, _ = long_snake_game(20, 0.6)
+
+    class Ctrl:
+        last_direction = "LEFT"
+
+    for name, (h, w) in RESOLUTIONS.items():
+        cell = 20
+        ui = UIOverlay(ox=max(10, (w - game.grid_size * cell) // 2), oy=80, cell_size=cell)
+        src = synthetic_frames(h, w, count=1)[0]
+        frame = src.copy()
+        t = [0.0]
+
+        def header():
+            t[0] += 0.05
+            ui.draw_header(frame, game.score, t[0])
+
+        cases = {
+            "draw_header": header,
+            "draw_game_area": lambda: ui.draw_game_area(frame, game.grid_size),
+            "draw_snake": lambda: ui.draw_snake(frame, game),
+            "draw_status": lambda: ui.draw_status(frame, Ctrl, game, False, 30),
+            "draw_game_over": lambda: ui.draw_game_over(frame, game.score),
+        }
+        for case, fn in cases.items():
+            # restore the frame before each call so repeated in-place draws don't saturate
+            results[f"renderer.{case} {name}"] = measure(fn, args.min_time, setup=lambda: np.copyto(frame, src))
+
+
+def _allocated(fn):
+    """Run fn; returns (result, bytes allocated above the current traced size at its peak)."""
+    tracemalloc.reset_peak()
+    base = tracemalloc.get_traced_memory()[0]
+    result = fn()
+    return result, tracemalloc.get_traced_memory()[1] - base
+
+
+def frame_path_allocations(h, w, frames=100, warmup=10):
+    """
+    Mean bytes allocated per frame by each stage of the frame path, for the
+    original allocate-per-call code ("before") and the pooled path ("after").
+    Frames are held one iteration, as LatestSlot does, so pooled buffers recycle.
+    """
+    try:
+        from finger_tracking import prepare_rgb
+    except Exception as e:  # mediapipe missing
+        print(f"preprocess: skipped ({e})", file=sys.stderr)
+        prepare_rgb = None
+    game, _ = long_snake_game(20, 0.6)
+
+    class Ctrl:
+        last_direction = "LEFT"
+
+    def legacy_capture():
+        ret, frame = source.read()
+        return cv2.flip(frame, 1)
+
+    def pooled_capture():
+        # the held frame is done with once the next one comes in, as in LatestSlot
+        if held is not None:
+            capture.pool.release(held)
+        return capture._grab()
+
+    def legacy_preprocess():
+        small = cv2.resize(held, None, fx=0.5, fy=0.5, interpolation=cv2.INTER_AREA)
+        return cv2.cvtColor(small, cv2.COLOR_BGR2RGB)
+
+    def pooled_render():
+        frame = render.get("frame", held.shape)
+        np.copyto(frame, held)
+        return frame
+
+    def draw():
+        ui.draw_header(canvas, game.score, 12.0)
+        ui.draw_game_area(canvas, game.grid_size)
+        ui.draw_snake(canvas, game)
+        ui.draw_status(canvas, Ctrl, game, False, 30)
+
+    totals = {}
+    for mode in ("before", "after"):
+        source = SyntheticSource(w, h)
+        capture = CaptureThread(source)
+        scratch = ScratchBuffers()
+        render = ScratchBuffers()
+        ui = UIOverlay(ox=max(10, (w - game.grid_size * 20) // 2), oy=80, cell_size=20)
+        stages = {
+            "capture": legacy_capture if mode == "before" else pooled_capture,
+            "preprocess": (legacy_preprocess if mode == "before" else lambda: prepare_rgb(held, 0.5, scratch))
+            if prepare_rgb else None,
+            "render_copy": (lambda: held.copy()) if mode == "before" else pooled_render,
+            "draw": draw,
+        }
+        held = canvas = None
+        sums = dict.fromkeys(stages, 0)
+        tracemalloc.start()
+        try:
+            for i in range(warmup + frames):
+                for stage, fn in stages.items():
+                    if fn is None:
+                        continue
+                    result, nbytes = _allocated(fn)
+                    if stage == "capture":
+                        held = result
+                    elif stage == "render_copy":
+                        canvas = result
+                    if i >= warmup:
+                        sums[stage] += nbytes
+        finally:
+            tracemalloc.stop()
+        for stage, total in sums.items():
+            if stages[stage] is not None:
+                totals.setdefault(stage, {})[mode] = total / frames
+    return totals
+
+
+def alloc_report(args):
+    print(f"{'bytes allocated per frame':<32} {'before':>12} {'after':>12}")
+    for name, (h, w) in RESOLUTIONS.items():
+        totals = frame_path_allocations(h, w)
+        for stage, r in totals.items():
+            print(f"{name + ' ' + stage:<32} {r['before']:>12,.0f} {r['after']:>12,.0f}")
+        before = sum(r["before"] for r in totals.values())
+        after = sum(r["after"] for r in totals.values())
+        print(f"{name + ' total':<32} {before:>12,.0f} {after:>12,.0f}")
+
+
+SUITES = {
+    "engine": bench_engine,
+    "controller": bench_controller,
+    "autopilot": bench_autopilot,
+    "spectator": bench_spectator,
+    "tracker": bench_tracker,
+    "gestures": bench_gestures,
+    "renderer": bench_renderer,
+}
+
+
+def compare(results, baseline, threshold):
+    """Return list of (name, old_p50, new_p50, ratio) for cases slower than baseline by > threshold."""
+    regressions = []
+    for name, r in results.items():
+        old = baseline.get(name)
+        if old is None:
+            continue
+        ratio = r["p50_us"] / old["p50_us"] if old["p50_us"] else 1.0
+        if ratio > 1.0 + threshold:
+            regressions.append((name, old["p50_us"], r["p50_us"], ratio))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark engine, controller, tracker and renderer hot paths (headless).")
+    parser.add_argument("suites", nargs="*", help=f"suites to run: {', '.join(SUITES)} (default: all)")
+    parser.add_argument("--min-time", type=float, default=0.5, help="seconds per case")
+    parser.add_argument("--frames", help="session recording with frames (main.py --record-frames) for the tracker")
+    parser.add_argument("--save", help="write results as a JSON baseline")
+    parser.add_argument("--compare", help="compare p50 against a JSON baseline")
+    parser.add_argument("--threshold", type=float, default=0.15, help="allowed p50 slowdown before flagging (0.15 = 15%%)")
+    parser.add_argument("--alloc", action="store_true",
+                        help="report bytes allocated per frame by the frame path (before/after buffer pooling)")
+    args = parser.parse_args()
+
+    if args.alloc:
+        alloc_report(args)
+        return
+
+    unknown = set(args.suites) - set(SUITES)
+    if unknown:
+        parser.error(f"unknown suite(s): {', '.join(sorted(unknown))}")
+
+    results = {}
+    for name in args.suites or list(SUITES):
+        SUITES[name](results, args)
+
+    print(f"{'case':<48} {'ops/s':>12} {'p50 us':>10} {'p95 us':>10} {'p99 us':>10}")
+    for name, r in results.items():
+        print(f"{name:<48} {r['throughput']:>12.1f} {r['p50_us']:>10.1f} {r['p95_us']:>10.1f} {r['p99_us']:>10.1f}")
+
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump(results, f, indent=2, sort_keys=True)
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.threshold)
+        for name, old, new, ratio in regressions:
+            print(f"REGRESSION {name}: p50 {old:.1f}us -> {new:.1f}us ({ratio:.2f}x)")
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
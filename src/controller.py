@@ -10,24 +10,31 @@ class FingerMotionController:
     - returns one of ["UP","DOWN","LEFT","RIGHT"] based on dominant movement
     - includes a motion_threshold and simple smoothing
     """
-    def __init__(self, motion_threshold=20, history_len=4):
+    def __init__(self, motion_threshold=20, history_len=4, clock=time.monotonic):
+        self.motion_threshold = motion_threshold
+        self.clock = clock
+        self.history = collections.deque(maxlen=history_len)  # store (x,y,t)
+        self.reset()
+
+    def reset(self):
+        """Back to the state of a new controller (new game), keeping the settings."""
         self.prev_x = None
         self.prev_y = None
         self.last_direction = "RIGHT"
-        self.motion_threshold = motion_threshold
-        self.history = collections.deque(maxlen=history_len)  # store (x,y,t)
-        self.last_update = time.time()
+        self.history.clear()
+        self.last_update = self.clock()
 
-    def get_direction(self, fingertip):
+    def get_direction(self, fingertip, t=None):
         """
         fingertip: (x,y) pixel coords or None
+        t: timestamp of the sample (default: now by self.clock)
         returns direction string (and updates internal state)
         """
         if fingertip is None:
             return self.last_direction
 
         x, y = fingertip
-        now = time.time()
+        now = self.clock() if t is None else t
 
         # initialize
         if not self.history:
@@ -60,3 +67,119 @@ class FingerMotionController:
         # prevent reversal to opposite direction directly — logic kept in game via change_direction
         self.last_direction = direction
         return direction
+
+
+class OneEuroFilter:
+    """
+    One-Euro filter (Casiez et al.) for a single coordinate.
+    Low cutoff when the signal is slow (kills jitter), higher cutoff as speed
+    grows (keeps lag low). Returns the filtered value and filtered derivative.
+    """
+    def __init__(self, min_cutoff=1.0, beta=0.02, d_cutoff=1.0):
+        self.min_cutoff = min_cutoff
+        self.beta = beta
+        self.d_cutoff = d_cutoff
+        self.reset()
+
+    def reset(self):
+        self.x = None
+        self.dx = None
+        self.t = None
+
+    @staticmethod
+    def _alpha(cutoff, dt):
+        tau = 1.0 / (2 * math.pi * cutoff)
+        return 1.0 / (1.0 + tau / dt)
+
+    def __call__(self, x, t):
+        if self.x is None or t <= self.t:
+            if self.x is None:
+                self.x, self.t = x, t
+            return self.x, self.dx or 0.0
+        dt = t - self.t
+        raw_dx = (x - self.x) / dt
+        if self.dx is None:
+            # second sample: no derivative history yet, take it as is
+            self.dx = raw_dx
+        else:
+            a_d = self._alpha(self.d_cutoff, dt)
+            self.dx = a_d * raw_dx + (1 - a_d) * self.dx
+        a = self._alpha(self.min_cutoff + self.beta * abs(self.dx), dt)
+        self.x = a * x + (1 - a) * self.x
+        self.t = t
+        return self.x, self.dx
+
+
+class FilteredMotionController:
+    """
+    Drop-in alternative to FingerMotionController with lower latency and less jitter:
+    - One-Euro filtered position/velocity per axis (reacts from the second sample,
+      no need to wait for a full history window)
+    - axis hysteresis: switching between horizontal and vertical needs the other
+      axis to be hysteresis times faster, so diagonals don't flicker
+    - commit_frames: a new direction must win this many consecutive samples
+    Same get_direction()/last_direction/history/reset() interface.
+    """
+    def __init__(self, motion_threshold=120, history_len=4, min_cutoff=1.0, beta=0.02, d_cutoff=8.0,
+                 hysteresis=1.3, commit_frames=2, clock=time.monotonic):
+        self.motion_threshold = motion_threshold  # px/s of filtered velocity
+        self.hysteresis = hysteresis
+        self.commit_frames = commit_frames
+        self.clock = clock
+        self.history = collections.deque(maxlen=history_len)  # store (x,y,t)
+        self.fx = OneEuroFilter(min_cutoff, beta, d_cutoff)
+        self.fy = OneEuroFilter(min_cutoff, beta, d_cutoff)
+        self.reset()
+
+    def reset(self):
+        """Back to the state of a new controller (new game), keeping the settings."""
+        self.last_direction = "RIGHT"
+        self.history.clear()
+        self.fx.reset()
+        self.fy.reset()
+        self._pending = None
+        self._pending_count = 0
+
+    def get_direction(self, fingertip, t=None):
+        """
+        fingertip: (x,y) pixel coords or None
+        t: timestamp of the sample (default: now by self.clock)
+        returns direction string (and updates internal state)
+        """
+        if fingertip is None:
+            return self.last_direction
+
+        x, y = fingertip
+        now = self.clock() if t is None else t
+        self.history.append((x, y, now))
+        _, vx = self.fx(x, now)
+        _, vy = self.fy(y, now)
+
+        if abs(vx) < self.motion_threshold and abs(vy) < self.motion_threshold:
+            # not enough movement -> keep last
+            self._pending = None
+            return self.last_direction
+
+        # dominant axis, biased towards the axis we are already moving on
+        if self.last_direction in ("LEFT", "RIGHT"):
+            horizontal = not abs(vy) > self.hysteresis * abs(vx)
+        else:
+            horizontal = abs(vx) > self.hysteresis * abs(vy)
+
+        if horizontal:
+            direction = "RIGHT" if vx > 0 else "LEFT"
+        else:
+            direction = "DOWN" if vy > 0 else "UP"
+
+        if direction == self.last_direction:
+            self._pending = None
+            return direction
+
+        if direction == self._pending:
+            self._pending_count += 1
+        else:
+            self._pending, self._pending_count = direction, 1
+        if self._pending_count >= self.commit_frames:
+            self.last_direction = direction
+            self._pending = None
+        return self.last_direction
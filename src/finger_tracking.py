@@ -1,46 +1,419 @@
 # src/finger_tracking.py
+import collections
+import math
+import threading
+import time
+
 import cv2
-import mediapipe as mp
+import numpy as np
+
+from frame_pool import ScratchBuffers
+from profiler import FrameProfiler
+
+# landmark indices used for gesture checks
+FINGER_TIPS = [8, 12, 16, 20]
+FINGER_PIPS = [6, 10, 14, 18]
+
+_NO_PROFILER = FrameProfiler(enabled=False)
+
+mp = None  # mediapipe module, imported by the first FingerTracker.load()
+
+
+def _import_mediapipe():
+    global mp
+    if mp is None:
+        import mediapipe
+        mp = mediapipe
+    return mp
+
+
+class HandResult:
+    """
+    Per-frame result of a single Mediapipe pass.
+    - fingertip: (x,y) pixel coords of the index fingertip or None
+    - landmarks: mediapipe landmark object or None
+    - open_palm: True if all four fingers are extended
+    - predicted: True if the fingertip was extrapolated instead of inferred
+    - gestures: frozenset of active Gesture names (debounced by GestureEngine)
+    - new_gestures: the subset that became active with this result
+    """
+    def __init__(self, fingertip=None, landmarks=None, open_palm=False, predicted=False,
+                 gestures=frozenset(), new_gestures=frozenset()):
+        self.fingertip = fingertip
+        self.landmarks = landmarks
+        self.open_palm = open_palm
+        self.predicted = predicted
+        self.gestures = gestures
+        self.new_gestures = new_gestures
+
+    @property
+    def detected(self):
+        return self.landmarks is not None
+
+
+def landmarks_to_array(hand_landmarks, out=None):
+    """Mediapipe landmarks -> (21, 3) float32 array of normalized x, y, z."""
+    values = [(lm.x, lm.y, lm.z) for lm in hand_landmarks.landmark]
+    if out is None:
+        return np.array(values, dtype=np.float32)
+    out[...] = values
+    return out
+
+
+class Gesture:
+    OPEN_PALM = "OPEN_PALM"
+    FIST = "FIST"
+    POINT = "POINT"
+    PINCH = "PINCH"
+    SWIPE_LEFT = "SWIPE_LEFT"
+    SWIPE_RIGHT = "SWIPE_RIGHT"
+    SWIPE_UP = "SWIPE_UP"
+    SWIPE_DOWN = "SWIPE_DOWN"
+
+
+# static poses as finger templates over (index, middle, ring, pinky):
+# 1 extended, 0 folded, -1 either; a new pose is one more row, not more code
+POSES = {
+    Gesture.OPEN_PALM: (1, 1, 1, 1),
+    Gesture.FIST: (0, 0, 0, 0),
+    Gesture.POINT: (1, 0, 0, 0),
+}
+SWIPES = (Gesture.SWIPE_LEFT, Gesture.SWIPE_RIGHT, Gesture.SWIPE_UP, Gesture.SWIPE_DOWN)
+GESTURES = tuple(POSES) + (Gesture.PINCH,) + SWIPES
+# templates as +1 extended / -1 folded / 0 either: a pose matches when its dot
+# product with the +-1 extension vector reaches the number of fingers it cares about
+_POSE_SIGNS = np.array([[{1: 1, 0: -1, -1: 0}[v] for v in pose] for pose in POSES.values()])
+_POSE_NEED = np.abs(_POSE_SIGNS).sum(axis=1)
+_PINCH = len(POSES)
+_FIST = GESTURES.index(Gesture.FIST)
+_OPEN_PALM = GESTURES.index(Gesture.OPEN_PALM)
+_SWIPE = slice(_PINCH + 1, len(GESTURES))
+
+
+def _feature_matrix():
+    """
+    Every landmark feature the classifiers use is linear in the landmarks, so
+    all of them come out of one (10, 63) matrix product with lm.reshape(-1):
+    - 0..3: tip y - PIP y per finger (<= 0: extended, image y grows downwards)
+    - 4, 5: thumb tip -> index tip (dx, dy); 6, 7: wrist -> middle MCP (dx, dy)
+    - 8, 9: palm center (mean of wrist and finger MCPs)
+    """
+    m = np.zeros((10, 21, 3), dtype=np.float32)
+    for row, (tip, pip) in enumerate(zip(FINGER_TIPS, FINGER_PIPS)):
+        m[row, tip, 1], m[row, pip, 1] = 1, -1
+    for row, (a, b) in ((4, (8, 4)), (6, (9, 0))):
+        m[row, a, 0], m[row, b, 0] = 1, -1
+        m[row + 1, a, 1], m[row + 1, b, 1] = 1, -1
+    m[8, [0, 5, 9, 13, 17], 0] = m[9, [0, 5, 9, 13, 17], 1] = 1 / 5
+    return m.reshape(10, -1)
+
+
+_FEATURES = _feature_matrix()
+
+
+def _classify(f, w, h, pinch_ratio, out):
+    out[:_PINCH] = _POSE_SIGNS @ np.where(f[:4] <= 0, 1, -1) == _POSE_NEED
+    pinch = math.hypot(f[4] * w, f[5] * h)
+    palm = math.hypot(f[6] * w, f[7] * h)
+    out[_PINCH] = pinch < pinch_ratio * palm and not out[_FIST]
+    out[_OPEN_PALM] &= not out[_PINCH]
+    out[_SWIPE] = False
+    return out
+
+
+def classify(lm, w=1, h=1, pinch_ratio=0.35, out=None):
+    """
+    Static gestures of one (21, 3) landmark array as a bool array over GESTURES
+    (swipes are always False here, they need GestureEngine's history).
+    All poses are one template match on the finger-extension vector; pinch is
+    thumb tip to index tip closer than pinch_ratio * palm length (wrist to
+    middle MCP), in pixels so the frame aspect ratio does not skew it, and
+    takes precedence over the open palm and gives way to the fist.
+    """
+    if out is None:
+        out = np.zeros(len(GESTURES), dtype=bool)
+    return _classify(_FEATURES @ lm.reshape(-1), w, h, pinch_ratio, out)
+
+
+def _names(mask):
+    return frozenset(name for name, on in zip(GESTURES, mask.tolist()) if on)
+
+
+class GestureEngine:
+    """
+    Debounced gestures for one tracked hand, fed once per inference:
+    - classify() for the static poses and pinch
+    - swipes: the palm center moving swipe_distance (fraction of the frame)
+      along one axis within swipe_window seconds; one event per swipe
+    - debouncing: a pose must be seen `hold` results in a row to become
+      active and be missing `release` results in a row to end; swipes are
+      active for the one result that completes them
+    The per-result cost is one feature matrix product plus a few operations
+    on per-gesture arrays, so adding poses keeps it flat.
+    update() returns (active, started) as frozensets of Gesture names.
+    """
+    def __init__(self, hold=2, release=2, pinch_ratio=0.35, swipe_distance=0.25, swipe_window=0.3,
+                 clock=time.monotonic):
+        self.pinch_ratio = pinch_ratio
+        self.swipe_distance = swipe_distance
+        self.swipe_window = swipe_window
+        self.clock = clock
+        count = len(GESTURES)
+        self._hold = np.full(count, hold)
+        self._release = np.full(count, release)
+        self._hold[_SWIPE] = self._release[_SWIPE] = 1
+        self._raw = np.zeros(count, dtype=bool)
+        self._streak = np.zeros(count, dtype=np.int64)  # > 0: results seen in a row, < 0: missed in a row
+        self._active = np.zeros(count, dtype=bool)
+        self._track = collections.deque()  # (t, x, y) of the palm center within swipe_window
+        self.active = frozenset()
+
+    def reset(self):
+        self._streak[:] = 0
+        self._active[:] = False
+        self._track.clear()
+        self.active = frozenset()
+
+    def _swipe(self, t, x, y):
+        track = self._track
+        track.append((t, x, y))
+        while track[0][0] < t - self.swipe_window:
+            track.popleft()
+        _, x0, y0 = track[0]
+        dx, dy = x - x0, y - y0
+        d = self.swipe_distance
+        if abs(dx) >= abs(dy):
+            swipe = 0 if dx <= -d else 1 if dx >= d else None
+        else:
+            swipe = 2 if dy <= -d else 3 if dy >= d else None
+        if swipe is not None:
+            self._raw[_SWIPE.start + swipe] = True
+            track.clear()  # one swipe per movement
+
+    def update(self, lm, w=1, h=1, t=None):
+        """lm: (21, 3) landmark array, or None when no hand was found."""
+        t = self.clock() if t is None else t
+        raw = self._raw
+        if lm is None:
+            raw[:] = False
+            self._track.clear()
+        else:
+            f = _FEATURES @ lm.reshape(-1)
+            _classify(f, w, h, self.pinch_ratio, raw)
+            self._swipe(t, float(f[8]), float(f[9]))
+        streak = self._streak
+        streak[:] = np.where(raw, np.maximum(streak, 0) + 1, np.minimum(streak, 0) - 1)
+        started = ~self._active & (streak >= self._hold)
+        self._active |= started
+        self._active &= streak > -self._release
+        self.active = _names(self._active)
+        return self.active, _names(started)
+
+
+def hand_result_from_array(lm, w, h):
+    """HandResult from a (21, 3) landmark array (no mediapipe object, landmarks=None; gestures not debounced)."""
+    fingertip = (int(lm[8, 0] * w), int(lm[8, 1] * h))
+    gestures = _names(classify(lm, w, h))
+    return HandResult(fingertip, None, Gesture.OPEN_PALM in gestures, gestures=gestures)
+
+
+def prepare_rgb(image, scale=1.0, scratch=None, profiler=None):
+    """
+    Mediapipe input: image resized by `scale` (INTER_AREA) and converted to RGB.
+    With a ScratchBuffers the resize and color outputs reuse the same memory
+    every frame; without one, new arrays are allocated.
+    """
+    profiler = profiler or _NO_PROFILER
+    if scale != 1.0:
+        ih, iw = image.shape[:2]
+        size = (max(1, round(iw * scale)), max(1, round(ih * scale)))
+        dst = scratch.get("resize", (size[1], size[0], 3)) if scratch is not None else None
+        with profiler.section("resize"):
+            image = cv2.resize(image, size, dst=dst, interpolation=cv2.INTER_AREA)
+    dst = scratch.get("rgb", image.shape) if scratch is not None else None
+    with profiler.section("color"):
+        return cv2.cvtColor(image, cv2.COLOR_BGR2RGB, dst=dst)
+
 
 class FingerTracker:
     """
     Lightweight wrapper around Mediapipe Hands.
-    get_index_finger(frame) -> (frame_with_drawings, (x,y) or None, hand_landmarks or None)
+    process(frame) -> HandResult (one color conversion + one inference per frame)
     Coordinates returned are pixel coordinates in the frame (BGR).
+
+    Reduced-cost inference modes:
+    - inference_scale < 1.0: full-frame detection runs on a downscaled copy
+    - roi_tracking: once a hand is found, only a padded crop around the last
+      landmarks is processed (resized to at most roi_max_side); if the hand is
+      lost in the crop, the same frame falls back to full-frame detection
+    Landmarks are always mapped back to full-frame coordinates.
+    Resize and color conversion write into reused scratch buffers.
+
+    Construction is cheap: Mediapipe is imported and the Hands graph built by
+    load(), which runs on first use or can be called ahead of time from a
+    background thread (InferenceWorker does this during the countdown).
+    Keep one tracker for the whole session so the model is loaded once.
     """
-    def __init__(self, max_num_hands=1, min_detection_confidence=0.6, min_tracking_confidence=0.6):
-        self.mp_hands = mp.solutions.hands
-        self.hands = self.mp_hands.Hands(
-            max_num_hands=max_num_hands,
-            min_detection_confidence=min_detection_confidence,
-            min_tracking_confidence=min_tracking_confidence
-        )
-        self.mp_draw = mp.solutions.drawing_utils
+    def __init__(self, max_num_hands=1, min_detection_confidence=0.6, min_tracking_confidence=0.6,
+                 inference_scale=1.0, roi_tracking=False, roi_padding=0.5, roi_max_side=256):
+        self.hands_options = {
+            "max_num_hands": max_num_hands,
+            "min_detection_confidence": min_detection_confidence,
+            "min_tracking_confidence": min_tracking_confidence,
+        }
+        self.mp_hands = None
+        self.hands = None
+        self.mp_draw = None
+        self.ready = threading.Event()
+        self.t_ready = None  # time.perf_counter() when load() finished
+        self._load_lock = threading.Lock()
 
-    def get_index_finger(self, frame, draw=True):
+        self.inference_scale = inference_scale
+        self.roi_tracking = roi_tracking
+        self.roi_padding = roi_padding
+        self.roi_max_side = roi_max_side
+        self.roi = None  # (x0, y0, x1, y1) pixel box for the next frame, None -> full frame
+
+        # timing per mode: name -> [total_seconds, count]; full_res is a one-off reference pass
+        self.timing = {"full_res": [0.0, 0], "full": [0.0, 0], "roi": [0.0, 0]}
+        self.roi_misses = 0
+        self.profiler = FrameProfiler(enabled=False)  # replace to time resize/color/inference
+        self.scratch = ScratchBuffers()
+        self.gestures = GestureEngine()  # debounced gestures of the hand tracked by process()
+        self._lm = np.empty((21, 3), dtype=np.float32)
+
+    def load(self):
         """
-        Process the frame, return (frame, fingertip_xy, hand_landmarks)
-        fingertip_xy is (x, y) in pixel coords or None if not found.
-        hand_landmarks is the mediapipe landmark object (or None).
+        Import Mediapipe, build the Hands graph and run one warm-up inference
+        (graph initialization happens on the first process() call). Thread-safe;
+        only the first call does any work. Returns self.
+        """
+        with self._load_lock:
+            if self.hands is None:
+                mp = _import_mediapipe()
+                self.mp_hands = mp.solutions.hands
+                self.mp_draw = mp.solutions.drawing_utils
+                hands = self.mp_hands.Hands(**self.hands_options)
+                hands.process(np.zeros((64, 64, 3), dtype=np.uint8))
+                self.hands = hands
+                self.t_ready = time.perf_counter()
+                self.ready.set()
+        return self
+
+    def _infer(self, image, max_side=None, scale=1.0):
+        """Resize (if needed), convert and run Mediapipe; returns the results object."""
+        if self.hands is None:
+            self.load()
+        if max_side is not None:
+            ih, iw = image.shape[:2]
+            scale = min(1.0, max_side / max(ih, iw))
+        profiler = self.profiler
+        rgb = prepare_rgb(image, scale, self.scratch, profiler)
+        with profiler.section("inference"):
+            return self.hands.process(rgb)
+
+    def _timed(self, mode, image, **kw):
+        t0 = time.perf_counter()
+        results = self._infer(image, **kw)
+        entry = self.timing[mode]
+        entry[0] += time.perf_counter() - t0
+        entry[1] += 1
+        return results
+
+    def _roi_from_landmarks(self, lm, w, h):
+        x_min, y_min = lm[:, :2].min(axis=0) * (w, h)
+        x_max, y_max = lm[:, :2].max(axis=0) * (w, h)
+        cx, cy = (x_min + x_max) / 2, (y_min + y_max) / 2
+        side = max(x_max - x_min, y_max - y_min) * (1 + 2 * self.roi_padding)
+        side = max(side, 64)
+        x0, y0 = int(max(0, cx - side / 2)), int(max(0, cy - side / 2))
+        x1, y1 = int(min(w, cx + side / 2)), int(min(h, cy + side / 2))
+        # not worth cropping if the box covers most of the frame
+        if (x1 - x0) * (y1 - y0) > 0.6 * w * h or x1 <= x0 or y1 <= y0:
+            return None
+        return (x0, y0, x1, y1)
+
+    def speedup_report(self):
+        """
+        Mean inference cost per mode (ms) and the speedup over full-resolution
+        full-frame inference (measured once on the first frame).
+        """
+        means = {k: 1000.0 * t / n for k, (t, n) in self.timing.items() if n}
+        total_t = self.timing["full"][0] + self.timing["roi"][0]
+        total_n = self.timing["full"][1] + self.timing["roi"][1]
+        if total_n and "full_res" in means:
+            means["speedup"] = means["full_res"] / (1000.0 * total_t / total_n)
+        means["roi_misses"] = self.roi_misses
+        return means
+
+    def process(self, frame):
+        """
+        Run hand inference once on the frame and return a HandResult
+        with the fingertip, landmarks and derived gestures.
         """
         h, w, _ = frame.shape
-        frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-        results = self.hands.process(frame_rgb)
+        reduced = self.inference_scale != 1.0 or self.roi_tracking
+        if reduced and self.timing["full_res"][1] == 0:
+            # reference cost for speedup_report()
+            self._timed("full_res", frame)
 
-        fingertip = None
-        hand_landmarks = None
+        results = None
+        box = self.roi if self.roi_tracking else None
+        if box is not None:
+            x0, y0, x1, y1 = box
+            results = self._timed("roi", frame[y0:y1, x0:x1], max_side=self.roi_max_side)
+            if results.multi_hand_landmarks:
+                # crop-normalized -> frame-normalized
+                bw, bh = x1 - x0, y1 - y0
+                for lm in results.multi_hand_landmarks[0].landmark:
+                    lm.x = (x0 + lm.x * bw) / w
+                    lm.y = (y0 + lm.y * bh) / h
+            else:
+                self.roi_misses += 1
+                results = None
+        if results is None:
+            results = self._timed("full", frame, scale=self.inference_scale)
 
-        if results.multi_hand_landmarks:
-            hand_landmarks = results.multi_hand_landmarks[0]
-            lm = hand_landmarks.landmark[8]  # index fingertip
-            cx, cy = int(lm.x * w), int(lm.y * h)
-            fingertip = (cx, cy)
+        if not results.multi_hand_landmarks:
+            self.roi = None
+            gestures, started = self.gestures.update(None)
+            return HandResult(gestures=gestures, new_gestures=started)
+
+        # landmarks -> array once; ROI, fingertip and gestures all read the array
+        hand_landmarks = results.multi_hand_landmarks[0]
+        lm = landmarks_to_array(hand_landmarks, self._lm)
+        if self.roi_tracking:
+            self.roi = self._roi_from_landmarks(lm, w, h)
+        fingertip = (int(lm[8, 0] * w), int(lm[8, 1] * h))  # index fingertip
+        gestures, started = self.gestures.update(lm, w, h)
+        return HandResult(fingertip, hand_landmarks, Gesture.OPEN_PALM in gestures, gestures=gestures,
+                          new_gestures=started)
 
-            if draw:
-                self.mp_draw.draw_landmarks(frame, hand_landmarks, self.mp_hands.HAND_CONNECTIONS)
-                cv2.circle(frame, (cx, cy), 8, (0, 255, 0), -1)
+    def process_all(self, frame):
+        """
+        Full-frame inference returning one HandResult per detected hand
+        (up to max_num_hands). ROI tracking and gesture debouncing only apply
+        to process().
+        """
+        h, w, _ = frame.shape
+        results = self._timed("full", frame, scale=self.inference_scale)
+        hands = []
+        for hand_landmarks in results.multi_hand_landmarks or ():
+            hand = hand_result_from_array(landmarks_to_array(hand_landmarks), w, h)
+            hand.landmarks = hand_landmarks
+            hands.append(hand)
+        return hands
 
-        return frame, fingertip, hand_landmarks
+    def get_index_finger(self, frame, draw=True):
+        """
+        Process the frame, return (frame, fingertip_xy, hand_landmarks)
+        fingertip_xy is (x, y) in pixel coords or None if not found.
+        hand_landmarks is the mediapipe landmark object (or None).
+        """
+        result = self.process(frame)
+        if draw:
+            frame = self.draw_hands(frame, result.landmarks)
+        return frame, result.fingertip, result.landmarks
 
     def draw_hands(self, frame, hand_landmarks):
         """
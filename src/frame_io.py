@@ -0,0 +1,215 @@
+# src/frame_io.py
+import glob
+import os
+import time
+
+import cv2
+import numpy as np
+
+IMAGE_EXTENSIONS = (".png", ".jpg", ".jpeg", ".bmp")
+
+
+def _fill(frame, image):
+    """Copy image into frame if the shapes match, else return a fresh copy."""
+    if frame is None or frame.shape != image.shape:
+        return image.copy()
+    np.copyto(frame, image)
+    return frame
+
+
+class VideoSource:
+    """
+    Camera or video file through cv2.VideoCapture.
+    All sources share the cv2.VideoCapture subset the game uses: read(), isOpened(), release().
+    Like cv2.VideoCapture.read(image), read(frame) fills `frame` in place when
+    the shape matches instead of allocating a new array.
+    The device is opened on first use (webcams can take seconds to open), so
+    creating the source is instant and the open can happen on the capture thread.
+    """
+    def __init__(self, target, loop=False):
+        self.target = target
+        self.loop = loop
+        self.cap = None
+
+    def _open(self):
+        if self.cap is None:
+            self.cap = cv2.VideoCapture(self.target)
+        return self.cap
+
+    def isOpened(self):
+        return self._open().isOpened()
+
+    def read(self, frame=None):
+        self._open()
+        ret, out = self.cap.read(frame)
+        if not ret and self.loop:
+            self.cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
+            ret, out = self.cap.read(frame)
+        return ret, out
+
+    def release(self):
+        if self.cap is not None:
+            self.cap.release()
+
+
+class ImageDirSource:
+    """Images from a directory in name order (optionally looping)."""
+    def __init__(self, path, loop=True):
+        self.paths = sorted(p for p in glob.glob(os.path.join(path, "*"))
+                            if p.lower().endswith(IMAGE_EXTENSIONS))
+        self.loop = loop
+        self.index = 0
+        self._cache = {}
+
+    def isOpened(self):
+        return bool(self.paths)
+
+    def read(self, frame=None):
+        if self.index >= len(self.paths):
+            if not self.loop or not self.paths:
+                return False, None
+            self.index = 0
+        path = self.paths[self.index]
+        self.index += 1
+        image = self._cache.get(path)
+        if image is None:
+            image = self._cache[path] = cv2.imread(path, cv2.IMREAD_COLOR)
+        if image is None:
+            return False, None
+        return True, _fill(frame, image)
+
+    def release(self):
+        self._cache.clear()
+
+
+class SyntheticSource:
+    """
+    Generated frames: a static textured background with a moving bright blob.
+    fps=None produces frames as fast as they are read; count=None never ends.
+    """
+    def __init__(self, width=640, height=480, fps=None, count=None, seed=0):
+        self.width = width
+        self.height = height
+        self.fps = fps
+        self.count = count
+        self.frame_index = 0
+        rng = np.random.default_rng(seed)
+        self.background = rng.integers(40, 120, size=(height, width, 3), dtype=np.uint8)
+        self._next_t = None
+
+    def isOpened(self):
+        return True
+
+    def read(self, frame=None):
+        if self.count is not None and self.frame_index >= self.count:
+            return False, None
+        if self.fps:
+            now = time.perf_counter()
+            if self._next_t is None:
+                self._next_t = now
+            delay = self._next_t - now
+            if delay > 0:
+                time.sleep(delay)
+            self._next_t += 1.0 / self.fps
+        i = self.frame_index
+        self.frame_index += 1
+        frame = _fill(frame, self.background)
+        cx = int(self.width / 2 + self.width / 3 * np.cos(i / 30))
+        cy = int(self.height / 2 + self.height / 3 * np.sin(i / 45))
+        cv2.circle(frame, (cx, cy), 30, (220, 200, 180), -1)
+        return True, frame
+
+    def release(self):
+        pass
+
+
+class WindowSink:
+    """On-screen OpenCV window; forwards mouse events to mouse_callback."""
+    def __init__(self, name="Finger Snake", size=(800, 600), mouse_callback=None):
+        self.name = name
+        cv2.namedWindow(name, cv2.WINDOW_NORMAL)
+        cv2.resizeWindow(name, *size)
+        if mouse_callback is not None:
+            cv2.setMouseCallback(name, mouse_callback)
+
+    def show(self, frame):
+        cv2.imshow(self.name, frame)
+
+    def poll_key(self):
+        """Pump window events; returns the pressed key (0-255) or -1."""
+        key = cv2.waitKey(1)
+        return key & 0xFF if key != -1 else -1
+
+    def close(self):
+        cv2.destroyAllWindows()
+
+
+class VideoWriterSink:
+    """Writes rendered frames to a video file (size taken from the first frame)."""
+    def __init__(self, path, fps=30.0, fourcc="mp4v"):
+        self.path = path
+        self.fps = fps
+        self.fourcc = cv2.VideoWriter_fourcc(*fourcc)
+        self.writer = None
+
+    def show(self, frame):
+        if self.writer is None:
+            h, w = frame.shape[:2]
+            self.writer = cv2.VideoWriter(self.path, self.fourcc, self.fps, (w, h))
+        self.writer.write(frame)
+
+    def poll_key(self):
+        return -1
+
+    def close(self):
+        if self.writer is not None:
+            self.writer.release()
+
+
+class NullSink:
+    """Discards frames; for headless throughput and soak tests."""
+    def show(self, frame):
+        pass
+
+    def poll_key(self):
+        return -1
+
+    def close(self):
+        pass
+
+
+def _split(spec):
+    kind, _, arg = spec.partition(":")
+    return kind, arg
+
+
+def open_source(spec):
+    """
+    webcam[:INDEX] | video:PATH | images:DIR | synthetic[:WxH[@FPS]]
+    """
+    kind, arg = _split(spec)
+    if kind == "webcam":
+        return VideoSource(int(arg) if arg else 0)
+    if kind == "video":
+        return VideoSource(arg)
+    if kind == "images":
+        return ImageDirSource(arg)
+    if kind == "synthetic":
+        size, _, fps = arg.partition("@")
+        w, _, h = size.partition("x") if size else ("640", "", "480")
+        return SyntheticSource(int(w), int(h), fps=float(fps) if fps else None)
+    raise ValueError(f"unknown frame source: {spec}")
+
+
+def open_sink(spec, mouse_callback=None):
+    """
+    window | video:PATH | null
+    """
+    kind, arg = _split(spec)
+    if kind == "window":
+        return WindowSink(mouse_callback=mouse_callback)
+    if kind == "video":
+        return VideoWriterSink(arg)
+    if kind == "null":
+        return NullSink()
+    raise ValueError(f"unknown frame sink: {spec}")
@@ -0,0 +1,60 @@
+# src/frame_pool.py
+import math
+import threading
+
+import numpy as np
+
+
+class BufferPool:
+    """
+    Recycled frame buffers of one shape, for frames handed between threads.
+    Ownership is explicit: acquire() hands a buffer out and it is reused only
+    after release() gives it back (pipeline.Packet does this once the slot has
+    replaced it and every consumer that retained it is done), so a producer
+    never overwrites a frame still being read.
+    - acquire(shape) returns a free buffer, allocating only if all are in use
+    - a new shape (camera resolution change) drops the old buffers; releasing
+      a buffer of an old shape just lets it go
+    - at most max_buffers free buffers are kept
+    - allocations counts buffers ever created; it stays flat in steady state
+    """
+    def __init__(self, max_buffers=8):
+        self.max_buffers = max_buffers
+        self.shape = None
+        self.allocations = 0
+        self._free = []
+        self._lock = threading.Lock()
+
+    def acquire(self, shape, dtype=np.uint8):
+        with self._lock:
+            if shape != self.shape:
+                self.shape = shape
+                self._free = []
+            if self._free:
+                return self._free.pop()
+            self.allocations += 1
+        return np.empty(shape, dtype=dtype)
+
+    def release(self, buf):
+        with self._lock:
+            if buf.shape == self.shape and len(self._free) < self.max_buffers:
+                self._free.append(buf)
+
+
+class ScratchBuffers:
+    """
+    Named scratch arrays reused across frames by a single thread.
+    get(name, shape) returns a contiguous view into a flat buffer that only
+    grows, so variable-size outputs (e.g. ROI crops) reuse memory too.
+    """
+    def __init__(self):
+        self._flat = {}
+        self.allocations = 0
+
+    def get(self, name, shape, dtype=np.uint8):
+        n = math.prod(shape)
+        flat = self._flat.get(name)
+        if flat is None or flat.size < n or flat.dtype != dtype:
+            flat = self._flat[name] = np.empty(n, dtype=dtype)
+            self.allocations += 1
+        return flat[:n].reshape(shape)
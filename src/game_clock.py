@@ -0,0 +1,78 @@
+# src/game_clock.py
+import time
+
+
+class SpeedCurve:
+    """
+    Maps the current score to a step interval (seconds per snake move).
+    - base_interval: interval at score 0
+    - speedup_per_food: seconds removed from the interval per food eaten
+    - min_interval: the interval never drops below this
+    """
+    def __init__(self, base_interval=0.14, speedup_per_food=0.0, min_interval=0.05, points_per_food=10):
+        self.base_interval = base_interval
+        self.speedup_per_food = speedup_per_food
+        self.min_interval = min_interval
+        self.points_per_food = points_per_food
+
+    def interval(self, score):
+        foods = score // self.points_per_food
+        return max(self.min_interval, self.base_interval - foods * self.speedup_per_food)
+
+
+class GameClock:
+    """
+    Fixed-timestep simulation clock.
+    - accumulates real (monotonic) time and runs SnakeGame.step() once per interval,
+      so game speed does not depend on how often the render loop gets to run
+    - at most max_catchup_steps steps per advance(); any backlog beyond that is
+      dropped (counted in skipped_steps) instead of making the snake jump across the board
+    - paused / game-over time is not accumulated
+    """
+    def __init__(self, speed_curve=None, max_catchup_steps=3, clock=time.monotonic):
+        self.speed_curve = speed_curve or SpeedCurve()
+        self.max_catchup_steps = max_catchup_steps
+        self.clock = clock
+        self.reset()
+
+    def reset(self, now=None):
+        self.last_time = self.clock() if now is None else now
+        self.accumulator = 0.0
+        self.skipped_steps = 0
+
+    def advance(self, game, now=None, running=True, before_step=None, after_step=None):
+        """
+        Step the game for the time elapsed since the last call.
+        before_step(game), if given, runs right before every step (autopilot);
+        after_step(game) right after it (event log).
+        Returns the number of steps taken.
+        """
+        now = self.clock() if now is None else now
+        dt = now - self.last_time
+        self.last_time = now
+
+        if not running or game.game_over:
+            self.accumulator = 0.0
+            return 0
+
+        self.accumulator += dt
+        interval = self.speed_curve.interval(game.score)
+        steps = 0
+        while self.accumulator >= interval and steps < self.max_catchup_steps:
+            if before_step is not None:
+                before_step(game)
+            game.step()
+            if after_step is not None:
+                after_step(game)
+            self.accumulator -= interval
+            steps += 1
+            if game.game_over:
+                self.accumulator = 0.0
+                return steps
+            interval = self.speed_curve.interval(game.score)
+
+        # catch-up limit reached: drop the remaining backlog
+        if self.accumulator >= interval:
+            self.skipped_steps += int(self.accumulator // interval)
+            self.accumulator %= interval
+        return steps
@@ -0,0 +1,103 @@
+# src/game_state.py
+
+
+class GameState:
+    COUNTDOWN = "COUNTDOWN"
+    PLAYING = "PLAYING"
+    PAUSED = "PAUSED"
+    GAME_OVER = "GAME_OVER"
+
+
+class GameSession:
+    """
+    Countdown, playing, paused and game over as states of the one render loop.
+    update() runs once per rendered frame and never blocks:
+    - COUNTDOWN -> PLAYING once the countdown has run out and `ready` is set
+      (camera and hand model up)
+    - PLAYING <-> PAUSED on an open palm / a closed hand
+    - PLAYING -> GAME_OVER when the snake dies; restart() -> COUNTDOWN
+    Restart only resets the game, the controller and the clock. Capture and
+    inference keep running in every state, so the tracker stays locked on the hand.
+    With a pilot (AutopilotController) the pilot steers before every step and
+    hand directions are ignored; the open palm still pauses.
+    observers (snapshot.EventLog, spectator.SpectatorServer) get record(game)
+    after every step and reset(game) after every restart.
+    """
+    def __init__(self, game, controller, clock, countdown=5, on_start=None, pilot=None, observers=(),
+                 reset_controller=None):
+        self.game = game
+        self.controller = controller
+        # when another thread feeds the controller, reset it there (InferenceWorker.request_reset)
+        self.reset_controller = reset_controller or controller.reset
+        self.pilot = pilot
+        self.observers = list(observers)
+        self.clock = clock  # GameClock
+        self.countdown = countdown
+        self.on_start = on_start  # called with the start time when a game starts
+        self.state = GameState.COUNTDOWN
+        self.countdown_t0 = clock.clock()
+        self.start_time = None
+        self.elapsed = 0.0
+
+    @property
+    def playing(self):
+        return self.state == GameState.PLAYING
+
+    @property
+    def paused(self):
+        return self.state == GameState.PAUSED
+
+    def remaining(self, now):
+        """Whole countdown seconds left."""
+        return max(0, self.countdown - int(now - self.countdown_t0))
+
+    def _start(self, now):
+        self.reset_controller()
+        if self.pilot is not None:
+            self.pilot.reset()
+        self.clock.reset(now)
+        self.start_time = now
+        self.elapsed = 0.0
+        self.state = GameState.PLAYING
+        if self.on_start is not None:
+            self.on_start(now)
+
+    def _record(self, game):
+        for observer in self.observers:
+            observer.record(game)
+
+    def restart(self, now):
+        """New game: back to the countdown without touching capture or inference."""
+        self.game.reset()
+        for observer in self.observers:
+            observer.reset(self.game)
+        self.countdown_t0 = now
+        self.elapsed = 0.0
+        self.state = GameState.COUNTDOWN
+
+    def update(self, now, hand=None, direction=None, ready=True):
+        """
+        Advance one frame. hand/direction: the newest inference result and the
+        controller direction for it, or None if nothing new arrived.
+        Returns the number of game steps taken.
+        """
+        if self.state == GameState.COUNTDOWN:
+            if ready and self.remaining(now) == 0:
+                self._start(now)
+            return 0
+
+        if self.state != GameState.GAME_OVER and hand is not None:
+            if hand.detected:
+                self.state = GameState.PAUSED if hand.open_palm else GameState.PLAYING
+            if self.state == GameState.PLAYING and direction is not None and self.pilot is None:
+                self.game.change_direction(direction)
+
+        steer = self.pilot.steer if self.pilot is not None else None
+        record = self._record if self.observers else None
+        steps = self.clock.advance(self.game, now, running=self.state == GameState.PLAYING,
+                                   before_step=steer, after_step=record)
+        if self.state != GameState.GAME_OVER:
+            self.elapsed = now - self.start_time
+        if self.game.game_over:
+            self.state = GameState.GAME_OVER
+        return steps
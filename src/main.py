@@ -1,182 +1,272 @@
-import cv2
+import argparse
+import random
 import time
-import mediapipe as mp
 
-from finger_tracking import FingerTracker
-from controller import FingerMotionController
+import numpy as np
+
+from finger_tracking import FingerTracker, Gesture
+from controller import FilteredMotionController
 from snake_game import SnakeGame
 from ui_overlay import UIOverlay, UIButtonEvents
+from pipeline import CaptureThread, InferenceWorker
+from profiler import FrameProfiler, StartupTimer
+from adaptive_inference import AdaptiveInferenceScheduler
+from autopilot import AutopilotController
+from game_clock import GameClock, SpeedCurve
+from game_state import GameSession, GameState
+from recording import SessionRecorder
+from snapshot import EventLog
+from spectator import SpectatorServer
+from frame_io import open_source, open_sink
+from frame_pool import ScratchBuffers
 
-def run_countdown(cap, ui, window_name="Finger Snake"):
-    start_time = time.time()
-    while True:
-        ret, frame = cap.read()
-        if not ret:
-            return False
-        frame = cv2.flip(frame, 1)
-        remaining = 5 - int(time.time() - start_time)
-        remaining = max(0, remaining)
-        frame = ui.draw_header(frame)
-        frame = ui.draw_countdown(frame, remaining)
-        cv2.imshow(window_name, frame)
-        
-        key = cv2.waitKey(1) & 0xFF
-        if key == ord('q'):
-            return False
-        if remaining == 0:
-            return True
+def shutdown(capture, worker, sink, profiler, profile_out=None, rendered=None, startup=None):
+    worker.stop()
+    capture.stop()
+    if worker.recorder is not None:
+        worker.recorder.close()
+    capture.cap.release()
+    sink.close()
+    if worker.error is not None:
+        print(f"ERROR: Hand tracking unavailable: {worker.error}")
+    elif capture.failed and (startup is None or "camera" not in startup.marks):
+        print("ERROR: Frame source not accessible")
+    if rendered is not None:
+        count, seconds = rendered
+        if seconds > 0:
+            print(f"Rendered {count} frames in {seconds:.1f}s ({count / seconds:.1f} fps)")
+    if startup is not None:
+        if worker.t_ready is not None:
+            startup.mark("model_ready", worker.t_ready)
+        if worker.t_first_result is not None:
+            startup.mark("first_inference", worker.t_first_result)
+        print(f"Startup: {startup.format()}")
+    if profiler.enabled:
+        print(f"Latency: {profiler.format()}")
+    if profile_out:
+        profiler.dump(profile_out)
+    print(f"Dropped frames: {capture.slot.dropped}")
+    print(f"Inference: {worker.tracker.speedup_report()}")
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Finger-controlled Nokia Snake.")
+    parser.add_argument("--source", default="webcam",
+                        help="frame source: webcam[:INDEX], video:PATH, images:DIR, synthetic[:WxH[@FPS]]")
+    parser.add_argument("--sink", default="window", help="frame sink: window, video:PATH or null (headless)")
+    parser.add_argument("--countdown", type=int, default=5, help="countdown seconds before each game")
+    parser.add_argument("--max-frames", type=int, default=None, help="exit after rendering this many frames")
+    parser.add_argument("--auto-restart", action="store_true", help="restart automatically after game over (soak tests)")
+    parser.add_argument("--seed", type=int, default=None, help="seed for food placement")
+    parser.add_argument("--autopilot", action="store_true",
+                        help="let the built-in planner play (attract mode, load tests); open palm still pauses")
+    parser.add_argument("--record", metavar="PATH", help="record the hand stream and game timeline for replay (src/recording.py)")
+    parser.add_argument("--event-log", metavar="PATH",
+                        help="log every game step in binary for replay and crash recovery (src/snapshot.py)")
+    parser.add_argument("--spectate", metavar="[HOST:]PORT",
+                        help="stream the game and timing metrics to spectators (src/spectator.py)")
+    parser.add_argument("--record-frames", action="store_true", help="also store JPEG-compressed camera frames")
+    parser.add_argument("--profile", action="store_true", help="time every stage and print a summary on exit")
+    parser.add_argument("--profile-hud", action="store_true", help="show per-stage p50/p95 latency on screen")
+    parser.add_argument("--profile-out", metavar="PATH",
+                        help="write the profile on exit: .csv (events), .trace.json (Chrome trace) or .json (summary)")
+    args = parser.parse_args(argv)
+    if args.autopilot and args.record:
+        parser.error("--record replays hand input; it cannot be combined with --autopilot")
+    return args
+
+def main(args=None):
+    if args is None:
+        args = parse_args()
+    startup = StartupTimer()
+    seed = args.seed if args.seed is not None else random.randrange(2**32)
+
+    # nothing here blocks: the camera opens on the capture thread and the hand
+    # model loads on the inference thread, both while the countdown runs
+    cap = open_source(args.source)
 
-def main():
-    cap = cv2.VideoCapture(0)
-    if not cap.isOpened():
-        print("ERROR: Camera not accessible.")
-        return
+    profiler = FrameProfiler(enabled=args.profile or args.profile_hud or bool(args.profile_out),
+                             keep_trace=bool(args.profile_out))
+    section = profiler.section
 
-    tracker = FingerTracker(min_detection_confidence=0.5, min_tracking_confidence=0.5)
-    controller = FingerMotionController()
-    game = SnakeGame(grid_size=20)
+    # one tracker (one Mediapipe graph) for the whole session, restarts included
+    tracker = FingerTracker(min_detection_confidence=0.5, min_tracking_confidence=0.5,
+                            inference_scale=0.5, roi_tracking=True)
+    tracker.profiler = profiler
+    controller = FilteredMotionController()
+    game = SnakeGame(grid_size=20, rng=random.Random(seed))
+    speed_curve = SpeedCurve(base_interval=0.14, speedup_per_food=0.002, min_interval=0.07)
 
     cell_size = 20
     oy = 80  # Increased offset to make room for header
 
     ui = UIOverlay(ox=20, oy=oy, cell_size=cell_size)
-    cv2.namedWindow("Finger Snake", cv2.WINDOW_NORMAL)
-    cv2.resizeWindow("Finger Snake", 800, 600)
-    cv2.setMouseCallback("Finger Snake", ui.mouse_callback)
-
-    mp_hands = mp.solutions.hands
-    hands = mp_hands.Hands(max_num_hands=1, min_detection_confidence=0.55)
-
-    # countdown
-    if not run_countdown(cap, ui):
-        cap.release()
-        cv2.destroyAllWindows()
-        return
-
-    game_start_time = time.time()
-    elapsed_time = 0
-
-    last_step = time.time()
-    step_interval = 0.14
-    paused = False
-    fps_t0 = time.time()
+    sink = open_sink(args.sink, ui.mouse_callback)
+    startup.mark("window")
+
+    # staged pipeline: capture thread -> inference worker -> render loop (this thread)
+    capture = CaptureThread(cap, profiler).start()
+    # inference every k frames, fingertip predicted in between
+    scheduler = AdaptiveInferenceScheduler(tracker, controller)
+    recorder = None
+    if args.record:
+        recorder = SessionRecorder(args.record, seed, game.grid_size, speed_curve,
+                                   type(controller).__name__, save_frames=args.record_frames)
+    worker = InferenceWorker(scheduler, controller, capture.slot, profiler, recorder).start()
+    worker.active = False
+
+    total_frames = 0
+    loop_t0 = time.perf_counter()
+
+    # countdown / playing / paused / game over are states of this one loop;
+    # restarting never stops capture or inference, so tracking stays warm
+    clock = GameClock(speed_curve)
+    on_start = (lambda t: recorder.mark("start", t)) if recorder is not None else None
+    pilot = AutopilotController(game) if args.autopilot else None
+    observers = []
+    event_log = EventLog(args.event_log, game) if args.event_log else None
+    if event_log is not None:
+        observers.append(event_log)
+    spectators = None
+    if args.spectate:
+        host, _, port = args.spectate.rpartition(":")
+        spectators = SpectatorServer(host or "0.0.0.0", int(port),
+                                     metrics=profiler.summary if profiler.enabled else None).start()
+        spectators.reset(game)
+        observers.append(spectators)
+    session = GameSession(game, controller, clock, args.countdown, on_start, pilot, observers,
+                          reset_controller=worker.request_reset)
+
+    fps_t0 = clock.clock()
     frames = 0
+    fps = "--"
+    frame_seq = 0
+    result_seq = 0
+    hand_landmarks = None
+    render = ScratchBuffers()  # the frame we draw on, reused every iteration
+    blank = np.zeros((480, 640, 3), dtype=np.uint8)
 
     while True:
-        ret, frame = cap.read()
-        if not ret:
+        if worker.error is not None:
             break
-        frame = cv2.flip(frame, 1)
+        # never block on capture or inference: render only when a new frame is in
+        seq, packet = capture.slot.latest()
+        if seq == 0:
+            # camera still opening: keep the countdown going on a blank frame
+            seq, packet = capture.slot.wait_newer(0, timeout=0.05)
+        if seq == 0:
+            image, t_capture = blank, None
+        elif seq == frame_seq or packet is None:
+            if capture.failed:
+                break
+            if sink.poll_key() == ord('q'):
+                break
+            capture.slot.wait_newer(frame_seq, timeout=0.001)
+            continue
+        else:
+            if not packet.retain():
+                continue  # already recycled for a newer frame: take that one
+            frame_seq = seq
+            image, t_capture = packet.frame, packet.t_capture
+            startup.mark("camera")
+        frame = render.get("frame", image.shape)
+        np.copyto(frame, image)
+        if t_capture is not None:
+            packet.release()
         h, w, _ = frame.shape
+        now = clock.clock()
 
         # compute centered ox
         grid_w = game.grid_size * cell_size
         ox = max(10, (w - grid_w) // 2)
         ui.ox = ox
 
-        # detect palm for pause
-        rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-        results = hands.process(rgb)
-
-        paused_local = False
-        if results.multi_hand_landmarks:
-            hand = results.multi_hand_landmarks[0]
-            tips = [8, 12, 16, 20]
-            pips = [6, 10, 14, 18]
-            paused_local = True
-            for tip, pip in zip(tips, pips):
-                if hand.landmark[tip].y > hand.landmark[pip].y:
-                    paused_local = False
-                    break
-            paused = paused_local
-
-        # fingertip detection (on clean frame)
-        frame, fingertip, hand_landmarks = tracker.get_index_finger(frame, draw=False)
-
-        # Update timer
-        if not game.game_over:
-            elapsed_time = time.time() - game_start_time
-
-        # draw UI background and board
-        frame = ui.draw_header(frame, game.score, elapsed_time)
-        frame = ui.draw_game_area(frame, game.grid_size)
-
-        # update direction & game
-        if not paused and not game.game_over:
-            direction = controller.get_direction(fingertip)
-            game.change_direction(direction)
-
-        # step
-        now = time.time()
-        if not paused and not game.game_over and (now - last_step) > step_interval:
-            game.step()
-            last_step = now
-
-        # redraw game area border for correct layering
-        # frame = ui.draw_game_area(frame, game.grid_size) # We can skip full redraw, just border if needed, but let's keep it simple
-        # Actually, we want the snake to be ON the board, and hands ON TOP of snake.
-        # Current order: Board -> Snake -> Hands
-        # But previously I did: Board -> Hands -> Snake (which covers hands) -> Board (covers snake?)
-        # Let's do: Board -> Snake -> Hands
-        
-        # draw snake and food (using circles for prettier look)
-        ox_local, oy_local = ui.ox, ui.oy
-        for (x, y) in game.snake:
-            # Draw circle for snake segment
-            center = (ox_local + x * cell_size + cell_size // 2, oy_local + y * cell_size + cell_size // 2)
-            cv2.circle(frame, center, cell_size // 2 - 1, (0, 255, 100), -1)
-
-        fx, fy = game.food
-        # Draw circle for food
-        center = (ox_local + fx * cell_size + cell_size // 2, oy_local + fy * cell_size + cell_size // 2)
-        cv2.circle(frame, center, cell_size // 2 - 2, (0, 100, 255), -1)
-
-        # draw hands on top of everything
-        frame = tracker.draw_hands(frame, hand_landmarks)
-
-        # game-over UI
-        if game.game_over:
-            frame = ui.draw_game_over(frame, game.score)
-
-            evt = ui.check_button_click()
-            if evt == UIButtonEvents.RESTART:
-                game.reset()
-                controller = FingerMotionController()
-                paused = False
-                
-                # Restart countdown
-                if not run_countdown(cap, ui):
-                    cap.release()
-                    cv2.destroyAllWindows()
-                    return
-
-                game_start_time = time.time()
-                elapsed_time = 0
-
-                cv2.imshow("Finger Snake", frame)
-                cv2.waitKey(1)
-            elif evt == UIButtonEvents.EXIT:
-                cap.release()
-                cv2.destroyAllWindows()
-                return
-
-        # status + fps
+        # pick up the newest inference result, if any
+        hand = direction = hand_event = None
+        seq, result = worker.slot.latest()
+        if result is not None and seq != result_seq:
+            result_seq = seq
+            hand, direction, hand_event = result.hand, result.direction, result.event
+            hand_landmarks = hand.landmarks
+            # pinch to press the game-over buttons (inferred results only: predictions
+            # extrapolate the controller, which is not fed after game over)
+            if not hand.predicted:
+                ui.hand_pointer(hand.fingertip, Gesture.PINCH in hand.gestures,
+                                click=session.state == GameState.GAME_OVER)
+
+        # state transitions + as many fixed steps as have elapsed, independent of frame rate
+        with section("game_step"):
+            if recorder is not None and session.state != GameState.COUNTDOWN:
+                recorder.frame(now, hand_event, direction)  # the replay steps the game here too
+            session.update(now, hand, direction, ready=worker.ready and frame_seq > 0)
+        worker.active = session.playing
+
+        # fps (last full second, kept until the next update)
         frames += 1
-        if time.time() - fps_t0 >= 1.0:
-            fps = int(frames / (time.time() - fps_t0))
-            fps_t0 = time.time()
+        if now - fps_t0 >= 1.0:
+            fps = int(frames / (now - fps_t0))
+            if spectators is not None:
+                spectators.info["fps"] = fps
+            fps_t0 = now
             frames = 0
+
+        if session.state == GameState.COUNTDOWN:
+            status = "Starting camera..." if frame_seq == 0 else (None if worker.ready else "Loading hand model...")
+            frame = ui.draw_header(frame)
+            frame = ui.draw_countdown(frame, session.remaining(now), status)
+            frame = tracker.draw_hands(frame, hand_landmarks)
         else:
-            fps = "--"
+            # draw UI background and board
+            with section("draw_header"):
+                frame = ui.draw_header(frame, game.score, session.elapsed)
+            with section("draw_game_area"):
+                frame = ui.draw_game_area(frame, game.grid_size)
+
+            # draw snake and food (Board -> Snake -> Hands)
+            with section("draw_snake"):
+                frame = ui.draw_snake(frame, game)
+
+            # draw hands on top of everything
+            with section("draw_hands"):
+                frame = tracker.draw_hands(frame, hand_landmarks)
 
-        frame = ui.draw_status(frame, controller, game, paused, fps)
+            # game-over UI
+            if session.state == GameState.GAME_OVER:
+                with section("draw_game_over"):
+                    frame = ui.draw_game_over(frame, game.score, game.won)
 
-        cv2.imshow("Finger Snake", frame)
-        if cv2.waitKey(1) & 0xFF == ord('q'):
+                evt = ui.check_button_click()
+                if args.auto_restart:
+                    evt = UIButtonEvents.RESTART
+                if evt == UIButtonEvents.RESTART:
+                    if recorder is not None:
+                        recorder.mark("restart", now)
+                    session.restart(now)
+                elif evt == UIButtonEvents.EXIT:
+                    break
+
+            with section("draw_status"):
+                frame = ui.draw_status(frame, pilot or controller, game, session.paused, fps,
+                                       profiler.hud_lines() if args.profile_hud else None)
+
+        with section("sink_show"):
+            sink.show(frame)
+        startup.mark("first_frame")
+        if t_capture is not None:
+            profiler.add("capture_to_display", time.perf_counter() - t_capture)
+        with section("sink_poll"):
+            key = sink.poll_key()
+        total_frames += 1
+        if key == ord('q'):
+            break
+        if args.max_frames is not None and total_frames >= args.max_frames:
             break
 
-    cap.release()
-    cv2.destroyAllWindows()
+    if event_log is not None:
+        event_log.close()
+    if spectators is not None:
+        spectators.stop()
+    shutdown(capture, worker, sink, profiler, args.profile_out,
+             (total_frames, time.perf_counter() - loop_t0), startup)
 
 if __name__ == "__main__":
     main()
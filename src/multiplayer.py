@@ -0,0 +1,410 @@
+# src/multiplayer.py
+import argparse
+import multiprocessing
+import queue
+import random
+import time
+from multiprocessing import shared_memory
+
+import cv2
+import numpy as np
+
+from controller import FilteredMotionController
+from finger_tracking import hand_result_from_array, landmarks_to_array
+from frame_io import open_source, open_sink
+from frame_pool import ScratchBuffers
+from game_clock import GameClock, SpeedCurve
+from pipeline import CaptureThread
+from snake_game import MOVES, SnakeGame
+from ui_overlay import UIOverlay
+
+SLOTS = 2  # frame/result slots per stream in shared memory
+PLAYER_COLORS = [(0, 255, 100), (255, 180, 0), (255, 0, 255), (0, 200, 255), (0, 120, 255), (255, 255, 255)]
+
+
+def _serve(tracker, frames, landmarks, max_hands, tasks, results):
+    while True:
+        task = tasks.get()
+        if task is None:
+            return
+        slot, seq = task
+        t0 = time.perf_counter()
+        hands = tracker.process_all(frames[slot])[:max_hands]
+        for i, hand in enumerate(hands):
+            landmarks_to_array(hand.landmarks, out=landmarks[slot, i])
+        results.put((slot, seq, len(hands), time.perf_counter() - t0))
+
+
+def _inference_main(frame_shm_name, frame_shape, result_shm_name, max_hands, tracker_kwargs, tasks, results):
+    """Worker process: Mediapipe on frames read straight from shared memory."""
+    from finger_tracking import FingerTracker
+
+    frame_shm = shared_memory.SharedMemory(name=frame_shm_name)
+    result_shm = shared_memory.SharedMemory(name=result_shm_name)
+    try:
+        tracker = FingerTracker(max_num_hands=max_hands, **tracker_kwargs).load()
+        _serve(tracker,
+               np.ndarray((SLOTS,) + frame_shape, dtype=np.uint8, buffer=frame_shm.buf),
+               np.ndarray((SLOTS, max_hands, 21, 3), dtype=np.float32, buffer=result_shm.buf),
+               max_hands, tasks, results)
+    except Exception as e:  # mediapipe missing or broken: reported by InferenceProcess.poll()
+        results.put(RuntimeError(f"{type(e).__name__}: {e}"))
+    finally:
+        frame_shm.close()
+        result_shm.close()
+
+
+class InferenceProcess:
+    """
+    One Mediapipe worker process per input stream.
+    Frames are copied into a shared-memory slot and only (slot, seq) goes over
+    the task queue; landmarks come back in a shared (slots, hands, 21, 3) float32
+    array and only (slot, seq, hand count, cost) goes over the result queue.
+    One frame is in flight at a time; frames arriving meanwhile are skipped.
+    If the worker fails or exits, poll() leaves the reason in `error`.
+    """
+    def __init__(self, frame_shape, max_hands=1, tracker_kwargs=None, ctx=None):
+        ctx = ctx or multiprocessing.get_context("spawn")
+        self.frame_shape = tuple(frame_shape)
+        self.max_hands = max_hands
+        self.frame_shm = shared_memory.SharedMemory(create=True, size=SLOTS * int(np.prod(self.frame_shape)))
+        self.result_shm = shared_memory.SharedMemory(create=True, size=SLOTS * max_hands * 21 * 3 * 4)
+        self.frames = np.ndarray((SLOTS,) + self.frame_shape, dtype=np.uint8, buffer=self.frame_shm.buf)
+        self.landmarks = np.ndarray((SLOTS, max_hands, 21, 3), dtype=np.float32, buffer=self.result_shm.buf)
+        self.tasks = ctx.Queue()
+        self.results = ctx.Queue()
+        self.process = ctx.Process(
+            target=_inference_main,
+            args=(self.frame_shm.name, self.frame_shape, self.result_shm.name, max_hands,
+                  tracker_kwargs or {}, self.tasks, self.results),
+            daemon=True)
+        self.process.start()
+        self.busy = False
+        self.seq = 0
+        self.next_slot = 0
+        self.cost = [0.0, 0]  # total inference seconds, count
+        self.error = None
+
+    def submit(self, frame):
+        """Queue a frame for inference; returns False if the worker is still busy."""
+        if self.busy:
+            return False
+        slot = self.next_slot
+        self.next_slot = (slot + 1) % SLOTS
+        if frame.shape != self.frame_shape:
+            frame = cv2.resize(frame, (self.frame_shape[1], self.frame_shape[0]))
+        np.copyto(self.frames[slot], frame)
+        self.seq += 1
+        self.tasks.put((slot, self.seq))
+        self.busy = True
+        return True
+
+    def poll(self):
+        """(n_hands, 21, 3) landmark array for the last finished frame, or None if not done."""
+        try:
+            result = self.results.get_nowait()
+        except queue.Empty:
+            if self.busy and self.error is None and not self.process.is_alive():
+                self.error = RuntimeError(f"inference process exited with code {self.process.exitcode}")
+            return None
+        self.busy = False
+        if isinstance(result, Exception):
+            self.error = result
+            return None
+        slot, seq, n, cost = result
+        self.cost[0] += cost
+        self.cost[1] += 1
+        return self.landmarks[slot, :n].copy()
+
+    def mean_cost_ms(self):
+        return 1000.0 * self.cost[0] / self.cost[1] if self.cost[1] else 0.0
+
+    def close(self):
+        self.tasks.put(None)
+        self.process.join(timeout=2.0)
+        if self.process.is_alive():
+            self.process.terminate()
+        self.frames = self.landmarks = None
+        for shm in (self.frame_shm, self.result_shm):
+            shm.close()
+            shm.unlink()
+
+
+class Player:
+    """One hand on one stream driving its own controller, SnakeGame and clock."""
+    def __init__(self, index, stream, grid_size, seed, speed_curve):
+        self.index = index
+        self.stream = stream
+        self.controller = FilteredMotionController()
+        self.game = SnakeGame(grid_size, rng=random.Random(seed + index))
+        self.clock = GameClock(speed_curve)
+        self.paused = False
+        self.fingertip = None
+        self.dead_since = None
+        self.ui = None
+        self.board = None  # SharedBoard on --board shared
+
+    def apply(self, hand):
+        self.fingertip = hand.fingertip
+        self.paused = hand.open_palm
+        if not self.paused and not self.game.game_over:
+            self.game.change_direction(self.controller.get_direction(hand.fingertip))
+
+    def restart(self, now):
+        if self.board is not None:
+            self.game.reset(*self.board.spawn_point(self))
+        else:
+            self.game.reset()
+        self.controller = FilteredMotionController()
+        self.clock.reset(now)
+        self.paused = False
+        self.dead_since = None
+
+
+class SharedBoard:
+    """
+    All players' snakes on one board (--board shared).
+    - each player starts on its own row, alternately heading right and left
+    - a restarting player gets its start cell back if it is clear, else a
+      random cell with a few free cells ahead of it
+    - food never spawns inside another live snake (SnakeGame.blocked)
+    - collide() runs after everyone has stepped and kills all colliding
+      players at once, so a head-on collision kills both whatever their order
+    Dead snakes stay on screen until they restart but no longer block anyone.
+    """
+    def __init__(self, players, grid_size, rng, runway=3):
+        self.players = players
+        self.grid_size = grid_size
+        self.rng = rng
+        self.runway = runway
+        n, count = grid_size, len(players)
+        for i, p in enumerate(players):
+            y = (i + 1) * n // (count + 1)
+            p.home = ((n // 4, y), "RIGHT") if i % 2 == 0 else ((n - 1 - n // 4, y), "LEFT")
+            p.board = self
+            p.game.blocked = lambda cell, p=p: self.taken(cell, p)
+            p.game.reset(*p.home)
+        for p in players:  # again, now that every snake is in place
+            p.game.spawn_food()
+
+    def taken(self, cell, player):
+        """True if cell is inside a live snake other than player's."""
+        return any(q is not player and not q.game.game_over and q.game.occupied[cell] for q in self.players)
+
+    def _clear(self, x, y, direction, player):
+        dx, dy = MOVES[direction]
+        n = self.grid_size
+        for k in range(self.runway + 1):
+            cx, cy = x + k * dx, y + k * dy
+            if not (0 <= cx < n and 0 <= cy < n) or self.taken(cy * n + cx, player):
+                return False
+        return True
+
+    def spawn_point(self, player):
+        """(start cell, direction) for player's next game."""
+        (x, y), direction = player.home
+        if self._clear(x, y, direction, player):
+            return player.home
+        n = self.grid_size
+        cells = list(range(n * n))
+        self.rng.shuffle(cells)
+        for cell in cells:
+            x, y = cell % n, cell // n
+            direction = "RIGHT" if x < n // 2 else "LEFT"
+            if self._clear(x, y, direction, player):
+                return (x, y), direction
+        return player.home  # board packed: nothing better
+
+    def collide(self):
+        """Call after every player has stepped: ends the games of snakes whose head hit another snake."""
+        n = self.grid_size
+        dead = [p for p in self.players
+                if not p.game.game_over and self.taken(p.game.snake[0][1] * n + p.game.snake[0][0], p)]
+        for p in dead:
+            p.game.game_over = True
+        # food another snake has since moved over, or that found no free cell last time
+        for p in self.players:
+            game = p.game
+            if not game.game_over and (game.food is None or self.taken(game.food[1] * n + game.food[0], p)):
+                game.spawn_food()
+
+
+def assign_hands(players, hands):
+    """Greedy nearest-fingertip matching so each hand keeps driving the same player."""
+    free = list(players)
+    pairs = []
+    for hand in hands:
+        if not free:
+            break
+        def dist(p):
+            if p.fingertip is None:
+                return float("inf")
+            return (p.fingertip[0] - hand.fingertip[0]) ** 2 + (p.fingertip[1] - hand.fingertip[1]) ** 2
+        best = min(free, key=dist)
+        free.remove(best)
+        pairs.append((best, hand))
+    return pairs
+
+
+def layout_boards(players, grid_size, width, height, shared):
+    """Give each player a UIOverlay; split = one board per player in a row, shared = one board."""
+    n = 1 if shared else len(players)
+    gap = 20
+    cell = max(4, min(20, (width - gap * (n + 1)) // (n * grid_size), (height - 120) // grid_size))
+    side = grid_size * cell
+    x0 = (width - (n * side + (n - 1) * gap)) // 2
+    for i, p in enumerate(players):
+        slot = 0 if shared else i
+        p.ui = UIOverlay(ox=x0 + slot * (side + gap), oy=80, cell_size=cell,
+                         snake_color=PLAYER_COLORS[i % len(PLAYER_COLORS)])
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Multi-player Finger Snake: one inference process per stream.")
+    parser.add_argument("--sources", nargs="+", default=["webcam:0"], help="frame sources (see main.py --source)")
+    parser.add_argument("--hands", type=int, default=1, help="players (hands) per source")
+    parser.add_argument("--board", choices=["split", "shared"], default="split",
+                        help="split: one board per player; shared: all snakes on one board, colliding with each other")
+    parser.add_argument("--grid", type=int, default=20)
+    parser.add_argument("--inference-scale", type=float, default=0.5)
+    parser.add_argument("--restart-delay", type=float, default=3.0, help="seconds before a dead player restarts")
+    parser.add_argument("--sink", default="window")
+    parser.add_argument("--max-frames", type=int, default=None)
+    parser.add_argument("--seed", type=int, default=0)
+    return parser.parse_args(argv)
+
+
+def main(args=None):
+    if args is None:
+        args = parse_args()
+    ctx = multiprocessing.get_context("spawn")
+
+    sources = [open_source(spec) for spec in args.sources]
+    for spec, src in zip(args.sources, sources):
+        if not src.isOpened():
+            print(f"ERROR: Frame source not accessible: {spec}")
+            return
+    captures = [CaptureThread(src).start() for src in sources]
+
+    first = []
+    for cap in captures:
+        ret, frame = cap.read(timeout=5.0)
+        if not ret:
+            print("ERROR: no frames from source")
+            return
+        first.append(frame)
+
+    tracker_kwargs = {"min_detection_confidence": 0.5, "min_tracking_confidence": 0.5,
+                      "inference_scale": args.inference_scale}
+    pools = [InferenceProcess(f.shape, args.hands, tracker_kwargs, ctx) for f in first]
+
+    # streams side by side at a common height
+    height = first[0].shape[0]
+    scales = [height / f.shape[0] for f in first]
+    widths = [int(round(f.shape[1] * s)) for f, s in zip(first, scales)]
+    offsets = [sum(widths[:i]) for i in range(len(widths))]
+    width = sum(widths)
+    canvas = np.zeros((height, width, 3), dtype=np.uint8)
+
+    speed_curve = SpeedCurve(base_interval=0.14, speedup_per_food=0.002, min_interval=0.07)
+    players = [Player(s * args.hands + k, s, args.grid, args.seed, speed_curve)
+               for s in range(len(captures)) for k in range(args.hands)]
+    shared = args.board == "shared"
+    board = SharedBoard(players, args.grid, random.Random(args.seed)) if shared else None
+    layout_boards(players, args.grid, width, height, shared)
+    sink = open_sink(args.sink)
+
+    render = ScratchBuffers()
+    last_seq = [0] * len(captures)
+    frames_out = 0
+    t0 = time.perf_counter()
+    try:
+        while True:
+            new = False
+            for s, (cap, pool) in enumerate(zip(captures, pools)):
+                seq, packet = cap.slot.latest()
+                if packet is not None and seq != last_seq[s] and packet.retain():
+                    last_seq[s] = seq
+                    new = True
+                    try:
+                        pool.submit(packet.frame)
+                        tile = canvas[:, offsets[s]:offsets[s] + widths[s]]
+                        if packet.frame.shape[:2] == tile.shape[:2]:
+                            np.copyto(tile, packet.frame)
+                        else:
+                            cv2.resize(packet.frame, (widths[s], height), dst=tile)
+                    finally:
+                        packet.release()
+                lms = pool.poll()
+                if lms is not None:
+                    h, w = pool.frame_shape[:2]
+                    hands = [hand_result_from_array(lm, w, h) for lm in lms]
+                    stream_players = [p for p in players if p.stream == s]
+                    for player, hand in assign_hands(stream_players, hands):
+                        player.apply(hand)
+            if all(cap.failed for cap in captures) or any(pool.error is not None for pool in pools):
+                break
+            if not new:
+                if sink.poll_key() == ord('q'):
+                    break
+                time.sleep(0.001)
+                continue
+
+            now = time.monotonic()
+            for p in players:
+                p.clock.advance(p.game, now, running=not p.paused)
+            if board is not None:
+                board.collide()  # running into another snake is fatal
+            for p in players:
+                if p.game.game_over:
+                    if p.dead_since is None:
+                        p.dead_since = now
+                    elif now - p.dead_since >= args.restart_delay:
+                        p.restart(now)
+
+            frame = render.get("frame", canvas.shape)
+            np.copyto(frame, canvas)
+            drawn = set()
+            for p in players:
+                ui = p.ui
+                if (ui.ox, ui.oy) not in drawn:
+                    ui.draw_game_area(frame, args.grid)
+                    drawn.add((ui.ox, ui.oy))
+                ui.draw_snake(frame, p.game)
+                state = "DEAD" if p.game.game_over else ("PAUSED" if p.paused else "")
+                label_y = 60 + (20 * p.index if shared else 0)
+                ui.text.put(frame, f"P{p.index + 1}: {p.game.score} {state}", (ui.ox, label_y),
+                            cv2.FONT_HERSHEY_SIMPLEX, 0.6, ui.snake_color, 2)
+                if p.fingertip is not None:
+                    s = p.stream
+                    tip = (offsets[s] + int(p.fingertip[0] * scales[s]), int(p.fingertip[1] * scales[s]))
+                    cv2.circle(frame, tip, 8, ui.snake_color, -1)
+
+            sink.show(frame)
+            frames_out += 1
+            if sink.poll_key() == ord('q'):
+                break
+            if args.max_frames is not None and frames_out >= args.max_frames:
+                break
+    finally:
+        elapsed = time.perf_counter() - t0
+        for cap in captures:
+            cap.stop()
+        for pool in pools:
+            pool.close()
+        for src in sources:
+            src.release()
+        sink.close()
+        for s, pool in enumerate(pools):
+            if pool.error is not None:
+                print(f"ERROR: Hand tracking unavailable (stream {s}): {pool.error}")
+        if elapsed > 0:
+            print(f"Rendered {frames_out} frames in {elapsed:.1f}s ({frames_out / elapsed:.1f} fps)")
+        for s, pool in enumerate(pools):
+            print(f"Stream {s}: {pool.cost[1]} inferences, {pool.mean_cost_ms():.1f}ms mean")
+        for p in players:
+            print(f"P{p.index + 1}: score {p.game.score}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,282 @@
+# src/pipeline.py
+import threading
+import time
+
+import cv2
+
+from frame_pool import BufferPool
+from profiler import FrameProfiler
+
+
+class LatestSlot:
+    """
+    Single-item mailbox where the newest value always wins.
+    - put() overwrites whatever is there (stale items are dropped, never queued)
+    - latest() never blocks, wait_newer() blocks until a newer item or timeout
+    - each item gets a sequence number so consumers can tell if it is new
+    - a replaced Packet is released (see Packet for frame ownership)
+    """
+    def __init__(self):
+        self._cond = threading.Condition()
+        self._item = None
+        self.seq = 0
+        self.dropped = 0
+        self._taken = 0
+
+    def put(self, item):
+        with self._cond:
+            if self.seq > self._taken:
+                self.dropped += 1
+            old, self._item = self._item, item
+            self.seq += 1
+            self._cond.notify_all()
+        if isinstance(old, Packet):
+            old.release()  # the slot's reference; consumers hold their own
+
+    def latest(self):
+        """Return (seq, item) without blocking. seq == 0 means nothing yet."""
+        with self._cond:
+            self._taken = self.seq
+            return self.seq, self._item
+
+    def wait_newer(self, seq, timeout=None):
+        """Block until an item newer than seq exists; returns (seq, item) or (seq, None) on timeout."""
+        with self._cond:
+            if not self._cond.wait_for(lambda: self.seq > seq, timeout):
+                return seq, None
+            self._taken = self.seq
+            return self.seq, self._item
+
+
+class Packet:
+    """
+    A captured frame with its capture timestamp (time.perf_counter).
+    A pooled packet owns its frame buffer: the LatestSlot holds one reference
+    and releases it when a newer packet replaces it. Consumers that read the
+    frame call retain() first (False: already recycled, skip it) and release()
+    when done; the buffer goes back to the pool when the last reference is gone.
+    """
+    __slots__ = ("frame", "t_capture", "pool", "_refs")
+
+    def __init__(self, frame, t_capture, pool=None):
+        self.frame = frame
+        self.t_capture = t_capture
+        self.pool = pool
+        self._refs = 1
+
+    def retain(self):
+        if self.pool is None:
+            return True
+        with self.pool._lock:
+            if self._refs == 0:
+                return False
+            self._refs += 1
+            return True
+
+    def release(self):
+        if self.pool is None:
+            return
+        with self.pool._lock:
+            self._refs -= 1
+            free = self._refs == 0
+        if free:
+            self.pool.release(self.frame)
+
+
+class CaptureThread:
+    """
+    Reads the camera on its own thread and keeps only the newest (mirrored) frame.
+    read() mirrors cv2.VideoCapture.read() so existing loops can use it unchanged.
+    Published frames come from a BufferPool and the camera reads into one
+    reused buffer, so steady-state capture allocates no new frames.
+    """
+    def __init__(self, cap, profiler=None, flip=True):
+        self.cap = cap
+        self.profiler = profiler or FrameProfiler(enabled=False)
+        self.flip = flip
+        self.pool = BufferPool()
+        self._raw = None
+        self.slot = LatestSlot()
+        self.running = False
+        self.failed = False
+        self._thread = None
+        self._read_seq = 0
+
+    def start(self):
+        self.running = True
+        self._thread = threading.Thread(target=self._run, name="capture", daemon=True)
+        self._thread.start()
+        return self
+
+    def _grab(self):
+        """Read the next frame into a pooled buffer (mirrored if flip); None at end of stream."""
+        if self.flip:
+            ret, self._raw = self.cap.read(self._raw)
+            if not ret:
+                return None
+            return cv2.flip(self._raw, 1, dst=self.pool.acquire(self._raw.shape))
+        shape = self.pool.shape
+        buf = self.pool.acquire(shape) if shape else None
+        ret, frame = self.cap.read(buf)
+        if not ret:
+            if buf is not None:
+                self.pool.release(buf)
+            return None
+        if frame.shape != shape:
+            # first frame or new resolution: pool this shape from now on
+            pooled = self.pool.acquire(frame.shape)
+            pooled[...] = frame
+            return pooled
+        return frame
+
+    def _run(self):
+        while self.running:
+            t0 = time.perf_counter()
+            frame = self._grab()
+            if frame is None:
+                self.failed = True
+                self.running = False
+                self.slot.put(None)
+                break
+            t1 = time.perf_counter()
+            self.profiler.add("capture", t1 - t0)
+            self.slot.put(Packet(frame, t1, self.pool))
+
+    def read(self, timeout=1.0):
+        """Return (ret, frame) for the next frame not yet returned by read()."""
+        while True:
+            self._read_seq, packet = self.slot.wait_newer(self._read_seq, timeout)
+            if packet is None:
+                return False, None
+            if packet.retain():
+                break
+        try:
+            return True, packet.frame.copy()
+        finally:
+            packet.release()
+
+    def stop(self):
+        self.running = False
+        if self._thread is not None:
+            self._thread.join(timeout=1.0)
+
+
+class InferenceResult:
+    """
+    Hand result for a given captured packet plus the controller direction at that time.
+    The packet is kept for its timestamps; its frame is not retained and may be reused.
+    event: index of the SessionRecorder hand event for this result (None if not recording).
+    """
+    __slots__ = ("packet", "hand", "direction", "t_done", "event")
+
+    def __init__(self, packet, hand, direction, t_done, event=None):
+        self.packet = packet
+        self.hand = hand
+        self.direction = direction
+        self.t_done = t_done
+        self.event = event
+
+
+class InferenceWorker:
+    """
+    Runs FingerTracker.process() on the newest captured frame and feeds the
+    controller. Frames that arrive while inference is busy are skipped.
+    Set `active` to False to stop feeding the controller (paused / game over).
+    If a SessionRecorder is set as `recorder`, every hand result and controller
+    reset is recorded, with the timestamp the controller saw.
+    The tracker's model is loaded on this thread before the first frame, so
+    starting the worker early overlaps loading with the countdown; `ready`,
+    `error`, `t_ready` and `t_first_result` report how that went. An exception
+    on the worker thread stops it and is left in `error`.
+    The controller belongs to this thread: other threads call request_reset()
+    instead of controller.reset(), and the reset runs before the next frame.
+    """
+    def __init__(self, tracker, controller, frames, profiler=None, recorder=None):
+        self.tracker = tracker
+        self.controller = controller
+        self.frames = frames
+        self.profiler = profiler or FrameProfiler(enabled=False)
+        self.recorder = recorder
+        self.slot = LatestSlot()
+        self.active = True
+        self.running = False
+        self.ready = False
+        self.error = None
+        self.t_ready = None
+        self.t_first_result = None
+        self._reset_requested = False
+        self._thread = None
+
+    def start(self):
+        self.running = True
+        self._thread = threading.Thread(target=self._run, name="inference", daemon=True)
+        self._thread.start()
+        return self
+
+    def _load(self):
+        load = getattr(self.tracker, "load", None)
+        try:
+            if load is not None:
+                load()
+        except Exception as e:  # mediapipe missing or broken
+            self.error = e
+            self.running = False
+            return False
+        self.t_ready = time.perf_counter()
+        self.ready = True
+        return True
+
+    def request_reset(self):
+        """Reset the controller (new game) on the worker thread, before the next frame."""
+        self._reset_requested = True
+
+    def _run(self):
+        if not self._load():
+            return
+        try:
+            self._loop()
+        except Exception as e:  # reported by main instead of silently losing hand input
+            self.error = e
+            self.running = False
+
+    def _loop(self):
+        seq = 0
+        while self.running:
+            if self._reset_requested:
+                self._reset_requested = False
+                self.controller.reset()
+                if self.recorder is not None:
+                    self.recorder.mark("reset", self.controller.clock())
+            seq, packet = self.frames.wait_newer(seq, timeout=0.1)
+            if packet is None or not packet.retain():
+                continue
+            try:
+                self._process(packet)
+            finally:
+                packet.release()
+
+    def _process(self, packet):
+        profiler = self.profiler
+        with profiler.section("hand_process"):
+            hand = self.tracker.process(packet.frame)
+        controller = self.controller
+        t = controller.clock()  # one timestamp for the controller and the recording
+        fed = self.active and not hand.open_palm
+        with profiler.section("controller"):
+            if fed:
+                direction = controller.get_direction(hand.fingertip, t)
+            else:
+                direction = controller.last_direction
+        event = None
+        if self.recorder is not None:
+            event = self.recorder.record(t, hand, packet.frame, fed)
+        t1 = time.perf_counter()
+        profiler.add("capture_to_inference", t1 - packet.t_capture)
+        if self.t_first_result is None:
+            self.t_first_result = t1
+        self.slot.put(InferenceResult(packet, hand, direction, t1, event))
+
+    def stop(self):
+        self.running = False
+        if self._thread is not None:
+            self._thread.join(timeout=1.0)
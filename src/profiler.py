@@ -0,0 +1,145 @@
+# src/profiler.py
+import collections
+import csv
+import json
+import threading
+import time
+
+
+class _Section:
+    __slots__ = ("profiler", "name", "t0")
+
+    def __init__(self, profiler, name):
+        self.profiler = profiler
+        self.name = name
+
+    def __enter__(self):
+        self.t0 = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.profiler._record(self.name, self.t0, time.perf_counter())
+        return False
+
+
+class _NullSection:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+NULL_SECTION = _NullSection()
+
+
+class FrameProfiler:
+    """
+    Hot-path instrumentation for the game loop and its worker threads.
+    - `with profiler.section("inference"): ...` times a block; add(stage, seconds)
+      records a duration measured elsewhere (e.g. capture-to-display latency)
+    - keeps a rolling window of samples per stage for mean/percentiles/max
+    - optionally keeps raw (stage, start, duration, thread) events for
+      dump() to CSV, JSON summary or Chrome trace format (chrome://tracing)
+    When disabled, section() returns a shared no-op object and add() returns
+    immediately, so instrumentation can stay in the hot path.
+    """
+    def __init__(self, enabled=True, window=300, keep_trace=False, trace_limit=500000):
+        self.enabled = enabled
+        self.window = window
+        self._samples = collections.defaultdict(lambda: collections.deque(maxlen=self.window))
+        self._lock = threading.Lock()
+        self.trace = collections.deque(maxlen=trace_limit) if keep_trace else None
+        self.t_origin = time.perf_counter()
+        self._hud_lines = []
+        self._hud_time = 0.0
+
+    def section(self, stage):
+        if not self.enabled:
+            return NULL_SECTION
+        return _Section(self, stage)
+
+    def _record(self, stage, t0, t1):
+        with self._lock:
+            self._samples[stage].append(t1 - t0)
+        if self.trace is not None:
+            self.trace.append((stage, t0, t1 - t0, threading.get_ident()))
+
+    def add(self, stage, seconds):
+        if not self.enabled:
+            return
+        with self._lock:
+            self._samples[stage].append(seconds)
+
+    def summary(self):
+        """dict stage -> {count, mean_ms, p50_ms, p95_ms, p99_ms, max_ms} over the rolling window."""
+        with self._lock:
+            snapshot = {k: sorted(v) for k, v in self._samples.items() if v}
+        out = {}
+        for stage, values in snapshot.items():
+            n = len(values)
+            out[stage] = {
+                "count": n,
+                "mean_ms": 1000.0 * sum(values) / n,
+                "p50_ms": 1000.0 * values[int(0.50 * (n - 1))],
+                "p95_ms": 1000.0 * values[int(0.95 * (n - 1))],
+                "p99_ms": 1000.0 * values[int(0.99 * (n - 1))],
+                "max_ms": 1000.0 * values[-1],
+            }
+        return out
+
+    def format(self):
+        return ", ".join(f"{k}: {s['mean_ms']:.1f}ms (p95 {s['p95_ms']:.1f})"
+                         for k, s in sorted(self.summary().items()))
+
+    def hud_lines(self, refresh=0.5):
+        """Short per-stage lines for the on-screen HUD, recomputed at most every `refresh` seconds."""
+        now = time.perf_counter()
+        if now - self._hud_time >= refresh:
+            self._hud_time = now
+            self._hud_lines = [f"{k}: {s['p50_ms']:.1f}/{s['p95_ms']:.1f}ms"
+                               for k, s in sorted(self.summary().items())]
+        return self._hud_lines
+
+    def dump(self, path):
+        """
+        Write the profile to path:
+        - *.csv: raw trace events (stage, start_ms, duration_ms, thread)
+        - *.trace.json: Chrome trace format
+        - *.json: per-stage summary
+        """
+        if path.endswith(".csv"):
+            with open(path, "w", newline="") as f:
+                writer = csv.writer(f)
+                writer.writerow(["stage", "start_ms", "duration_ms", "thread"])
+                for stage, t0, dur, tid in self.trace or ():
+                    writer.writerow([stage, f"{1000.0 * (t0 - self.t_origin):.3f}", f"{1000.0 * dur:.3f}", tid])
+        elif path.endswith(".trace.json"):
+            events = [{"name": stage, "ph": "X", "pid": 0, "tid": tid,
+                       "ts": 1e6 * (t0 - self.t_origin), "dur": 1e6 * dur}
+                      for stage, t0, dur, tid in self.trace or ()]
+            with open(path, "w") as f:
+                json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, f)
+        else:
+            with open(path, "w") as f:
+                json.dump(self.summary(), f, indent=2, sort_keys=True)
+
+
+class StartupTimer:
+    """
+    One-off startup milestones (time to window, first frame, first inference...),
+    in seconds since t0. mark() keeps only the first time a milestone is reached.
+    """
+    def __init__(self, t0=None):
+        self.t0 = time.perf_counter() if t0 is None else t0
+        self.marks = {}
+
+    def mark(self, name, t=None):
+        """Record milestone `name` at perf_counter time t (default: now), once."""
+        if name not in self.marks:
+            self.marks[name] = (time.perf_counter() if t is None else t) - self.t0
+
+    def format(self):
+        return ", ".join(f"{name} {1000 * dt:.0f}ms" for name, dt in sorted(self.marks.items(), key=lambda kv: kv[1]))
@@ -0,0 +1,240 @@
+# src/recording.py
+import argparse
+import base64
+import hashlib
+import json
+import random
+import threading
+import time
+
+import cv2
+import numpy as np
+
+import controller as controller_module
+from finger_tracking import HandResult
+from game_clock import GameClock, SpeedCurve
+from game_state import GameSession
+from snake_game import SnakeGame
+from snapshot import RESET, STEP, load_log
+
+FORMAT_VERSION = 2
+
+
+class SessionRecorder:
+    """
+    Writes a camera session as JSON lines:
+    - first line: header (seed, grid size, speed curve, controller class)
+    - inference thread: one "hand" event per inference (the timestamp the
+      controller saw, fingertip, open-palm flag, whether the controller was
+      fed, 21x3 landmarks, optional JPEG frame as base64) and a "reset" event
+      whenever the controller is reset
+    - render thread: "start" when a game starts (after each countdown),
+      "restart" when it goes back to the countdown, and one "frame" event per
+      GameSession.update() in between (time, index of the hand event picked
+      up, if any, and the direction applied), which is where the live game
+      changes direction and steps
+    Floats are written with repr precision, so a replay reads back exactly the
+    values that were recorded.
+    """
+    def __init__(self, path, seed, grid_size, speed_curve, controller_name,
+                 save_frames=False, jpeg_quality=80):
+        self.path = path
+        self.save_frames = save_frames
+        self.jpeg_quality = jpeg_quality
+        self._lock = threading.Lock()
+        self._hands = 0
+        self._file = open(path, "w")
+        self._write({
+            "type": "header",
+            "version": FORMAT_VERSION,
+            "seed": seed,
+            "grid_size": grid_size,
+            "speed_curve": vars(speed_curve),
+            "controller": controller_name,
+            "frames": save_frames,
+        })
+
+    def _write(self, event):
+        with self._lock:
+            self._file.write(json.dumps(event) + "\n")
+
+    def record(self, t, hand, frame=None, fed=True):
+        """Write a hand event; returns its index for frame()."""
+        landmarks = None
+        if hand.landmarks is not None:
+            landmarks = [[lm.x, lm.y, lm.z] for lm in hand.landmarks.landmark]
+        event = {
+            "type": "hand",
+            "t": t,
+            "tip": list(hand.fingertip) if hand.fingertip is not None else None,
+            "palm": hand.open_palm,
+            "fed": fed,
+            "lm": landmarks,
+        }
+        if self.save_frames and frame is not None:
+            ok, buf = cv2.imencode(".jpg", frame, [cv2.IMWRITE_JPEG_QUALITY, self.jpeg_quality])
+            if ok:
+                event["jpg"] = base64.b64encode(buf.tobytes()).decode("ascii")
+        with self._lock:
+            index = self._hands
+            self._hands += 1
+            self._file.write(json.dumps(event) + "\n")
+        return index
+
+    def frame(self, t, hand_event, direction):
+        """A GameSession.update(t, ...) call; hand_event is record()'s index or None."""
+        self._write({"type": "frame", "t": t, "hand": hand_event, "dir": direction})
+
+    def mark(self, event_type, t):
+        self._write({"type": event_type, "t": t})
+
+    def close(self):
+        with self._lock:
+            self._file.close()
+
+
+def load_session(path):
+    """Return (header, list of events)."""
+    with open(path) as f:
+        header = json.loads(f.readline())
+        if header.get("type") != "header" or header.get("version") != FORMAT_VERSION:
+            raise ValueError(f"{path}: not a session recording (version {FORMAT_VERSION})")
+        events = [json.loads(line) for line in f if line.strip()]
+    return header, events
+
+
+def decode_frame(event):
+    """BGR frame stored with an event, or None."""
+    data = event.get("jpg")
+    if data is None:
+        return None
+    return cv2.imdecode(np.frombuffer(base64.b64decode(data), dtype=np.uint8), cv2.IMREAD_COLOR)
+
+
+class _StepTrace:
+    """GameSession observer keeping (kind, head cell, score) per step and reset, like an EventLog."""
+    def __init__(self):
+        self.records = []
+
+    def _add(self, game, kind):
+        x, y = game.snake[0]
+        self.records.append((kind, y * game.grid_size + x, game.score))
+
+    def record(self, game):
+        self._add(game, STEP)
+
+    def reset(self, game):
+        self._add(game, RESET)
+
+
+def replay(path, realtime=False, on_step=None, observers=()):
+    """
+    Re-run a recording single-threaded, driven only by the recorded events and seed:
+    - hand events feed the controller at the timestamps it saw live
+    - frame, start and restart events drive a GameSession the way the render
+      loop did, applying the replayed controller's direction for the hand
+      event each frame picked up
+    So the game steps exactly when the live one did and every replay of the
+    same file (on any build with the same logic) produces the same states.
+    on_step(event, game, controller, paused) is called after every event;
+    observers are passed on to the GameSession (see check_log).
+    Returns (sha256 hex digest of all per-event states, list of states).
+    """
+    header, events = load_session(path)
+    now = [events[0]["t"] if events else 0.0]
+    controller_cls = getattr(controller_module, header["controller"])
+
+    game = SnakeGame(header["grid_size"], rng=random.Random(header["seed"]))
+    ctrl = controller_cls(clock=lambda: now[0])
+    clock = GameClock(SpeedCurve(**header["speed_curve"]), clock=lambda: now[0])
+    # countdown 0: a "start" event starts the game on the spot; controller resets are events of their own
+    session = GameSession(game, ctrl, clock, countdown=0, observers=observers, reset_controller=lambda: None)
+    hands = []  # (HandResult, controller direction) per hand event
+
+    digest = hashlib.sha256()
+    states = []
+    wall_t0 = time.monotonic()
+    for event in events:
+        kind = event["type"]
+        t = now[0] = event["t"]
+        if realtime:
+            delay = (t - events[0]["t"]) - (time.monotonic() - wall_t0)
+            if delay > 0:
+                time.sleep(delay)
+
+        if kind == "hand":
+            tip = tuple(event["tip"]) if event["tip"] is not None else None
+            direction = ctrl.get_direction(tip, t) if event["fed"] else ctrl.last_direction
+            # the landmarks only matter to the session as "hand detected"
+            hands.append((HandResult(tip, event["lm"], event["palm"]), direction))
+        elif kind == "reset":
+            ctrl.reset()
+        elif kind == "start":
+            session.update(t)
+        elif kind == "restart":
+            session.restart(t)
+        elif kind == "frame":
+            hand, direction = hands[event["hand"]] if event["hand"] is not None else (None, None)
+            session.update(t, hand, direction)
+
+        state = (t, game.score, tuple(game.snake), game.food, game.direction, game.game_over, session.paused)
+        digest.update(repr(state).encode())
+        states.append(state)
+        if on_step is not None:
+            on_step(event, game, ctrl, session.paused)
+
+    return digest.hexdigest(), states
+
+
+def check_log(path, log_path):
+    """
+    Replay a recording and compare every step and reset with the event log
+    (main.py --event-log) written during the same run. Returns the number of
+    records compared; raises ValueError at the first mismatch.
+    """
+    start, records = load_log(log_path)
+    trace = _StepTrace()
+    replay(path, observers=[trace])
+    n = start.grid_size
+    logged = list(zip(records["kind"].tolist(), records["head"].tolist(), records["score"].tolist()))
+    for i, (want, got) in enumerate(zip(logged, trace.records)):
+        if want != got:
+            head, want_head = got[1], want[1]
+            raise ValueError(f"{path}: replay diverges from {log_path} at record {i}: "
+                             f"head {(head % n, head // n)} score {got[2]}, "
+                             f"logged {(want_head % n, want_head // n)} score {want[2]}")
+    if len(logged) != len(trace.records):
+        raise ValueError(f"{path}: replay took {len(trace.records)} steps and resets, "
+                         f"{log_path} has {len(logged)}")
+    return len(logged)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay a recorded Finger Snake session.")
+    parser.add_argument("session", help="recording written with main.py --record")
+    parser.add_argument("--realtime", action="store_true", help="replay at recorded speed instead of as fast as possible")
+    parser.add_argument("--trace", help="write one line per event state, for diffing two builds")
+    parser.add_argument("--check-log", metavar="PATH",
+                        help="check the replay step by step against the --event-log of the same run")
+    args = parser.parse_args()
+
+    if args.check_log:
+        count = check_log(args.session, args.check_log)
+        print(f"replay matches {args.check_log}: {count} records")
+        return
+
+    t0 = time.perf_counter()
+    digest, states = replay(args.session, realtime=args.realtime)
+    elapsed = time.perf_counter() - t0
+
+    if args.trace:
+        with open(args.trace, "w") as f:
+            for state in states:
+                f.write(repr(state) + "\n")
+    final = states[-1] if states else None
+    print(f"events: {len(states)}  time: {elapsed:.3f}s  final score: {final[1] if final else 0}")
+    print(f"digest: {digest}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+# src/render_cache.py
+import cv2
+import numpy as np
+
+
+def blit(frame, patch, mask, x, y, inv_alpha=None):
+    """
+    Copy patch onto frame at top-left (x,y) where mask != 0, clipped to the frame.
+    If inv_alpha (255 - alpha, 3 channels) is given, patch is treated as
+    premultiplied and alpha-blended instead (anti-aliased edges).
+    """
+    h, w = frame.shape[:2]
+    ph, pw = patch.shape[:2]
+    x0, y0 = max(0, x), max(0, y)
+    x1, y1 = min(w, x + pw), min(h, y + ph)
+    if x0 >= x1 or y0 >= y1:
+        return frame
+    px, py = x0 - x, y0 - y
+    src = (slice(py, py + (y1 - y0)), slice(px, px + (x1 - x0)))
+    roi = frame[y0:y1, x0:x1]
+    if inv_alpha is None:
+        cv2.copyTo(patch[src], mask[src], roi)
+    else:
+        blended = cv2.multiply(roi, inv_alpha[src], scale=1.0 / 255)
+        cv2.add(blended, patch[src], dst=blended)
+        cv2.copyTo(blended, mask[src], roi)
+    return frame
+
+
+class Sprite:
+    """
+    Pre-rasterized patch + uint8 alpha mask. Built by calling draw(canvas, value)
+    twice: once on a black BGR canvas with the real color and once on the mask with 255.
+    Hard-edged sprites are pasted with a masked copy; if the backend anti-aliases
+    (partial alpha values in the mask) they are alpha-blended instead.
+    """
+    def __init__(self, size, draw, color):
+        h, w = size
+        self.image = np.zeros((h, w, 3), dtype=np.uint8)
+        self.mask = np.zeros((h, w), dtype=np.uint8)
+        draw(self.image, color)
+        draw(self.mask, 255)
+        self.inv_alpha = None
+        if np.any((self.mask > 0) & (self.mask < 255)):
+            self.inv_alpha = cv2.merge([255 - self.mask] * 3)
+
+    def blit(self, frame, x, y):
+        return blit(frame, self.image, self.mask, x, y, self.inv_alpha)
+
+
+def circle_sprite(cell_size, radius, color):
+    """A filled circle centered in a cell, same pixels as cv2.circle at the cell center."""
+    c = cell_size // 2
+    return Sprite((cell_size, cell_size), lambda canvas, col: cv2.circle(canvas, (c, c), radius, col, -1), color)
+
+
+class TextCache:
+    """
+    Pre-rendered text strips keyed by (text, font, scale, color, thickness).
+    A strip is only rasterized the first time a value is seen; static labels are
+    rendered once and changing ones (score, timer, FPS) once per distinct value.
+    """
+    def __init__(self, max_entries=256):
+        self.max_entries = max_entries
+        self._entries = {}
+
+    def _get(self, text, font, scale, color, thick):
+        key = (text, font, scale, color, thick)
+        entry = self._entries.get(key)
+        if entry is None:
+            (tw, th), baseline = cv2.getTextSize(text, font, scale, thick)
+            margin = thick + 2
+            size = (th + baseline + 2 * margin, tw + 2 * margin)
+            origin = (margin, th + margin)
+            sprite = Sprite(size, lambda canvas, col: cv2.putText(canvas, text, origin, font, scale, col, thick), color)
+            entry = ((tw, th), sprite, origin)
+            if len(self._entries) >= self.max_entries:
+                del self._entries[next(iter(self._entries))]
+            self._entries[key] = entry
+        return entry
+
+    def text_size(self, text, font, scale, thick):
+        """Same as cv2.getTextSize(...)[0], cached."""
+        return self._get(text, font, scale, (0, 0, 0), thick)[0]
+
+    def put(self, frame, text, org, font, scale, color, thick=1):
+        """Drop-in for cv2.putText(frame, text, org, font, scale, color, thick)."""
+        _, sprite, (mx, my) = self._get(text, font, scale, color, thick)
+        return sprite.blit(frame, org[0] - mx, org[1] - my)
+
+
+class SnakeLayer:
+    """
+    Board-sized layer holding the rendered snake body.
+    Only cells whose occupancy changed since the last frame are redrawn (dirty
+    cells), and the whole layer is composited with one masked copy, so render
+    cost does not grow with snake length.
+    """
+    def __init__(self, grid_size, cell_size, color=(0, 255, 100)):
+        self.grid_size = grid_size
+        self.cell_size = cell_size
+        self.segment = circle_sprite(cell_size, cell_size // 2 - 1, color)
+        side = grid_size * cell_size
+        self.image = np.zeros((side, side, 3), dtype=np.uint8)
+        self.mask = np.zeros((side, side), dtype=np.uint8)
+        self.occupied = np.zeros(grid_size * grid_size, dtype=np.uint8)
+
+    def sync(self, occupied):
+        """Redraw cells whose occupancy differs from `occupied` (SnakeGame.occupied)."""
+        current = np.frombuffer(occupied, dtype=np.uint8)
+        dirty = np.flatnonzero(current != self.occupied)
+        if dirty.size == 0:
+            return
+        n, cs = self.grid_size, self.cell_size
+        for cell in dirty.tolist():
+            y, x = divmod(cell, n)
+            ys, xs = slice(y * cs, (y + 1) * cs), slice(x * cs, (x + 1) * cs)
+            if current[cell]:
+                self.image[ys, xs] = self.segment.image
+                self.mask[ys, xs] = self.segment.mask
+            else:
+                self.image[ys, xs] = 0
+                self.mask[ys, xs] = 0
+        self.occupied[dirty] = current[dirty]
+
+    def blit(self, frame, ox, oy):
+        return blit(frame, self.image, self.mask, ox, oy)
@@ -1,39 +1,95 @@
 # src/snake_game.py
+import collections
 import random
 
+# integer direction codes (index into DIRECTIONS); opposite of code c is c ^ 1
+DIRECTIONS = ("UP", "DOWN", "LEFT", "RIGHT")
+OPPOSITE = {"UP": "DOWN", "DOWN": "UP", "LEFT": "RIGHT", "RIGHT": "LEFT"}
+MOVES = {"UP": (0, -1), "DOWN": (0, 1), "LEFT": (-1, 0), "RIGHT": (1, 0)}
+
+
 class SnakeGame:
     """
     Classic grid-based snake engine.
     - grid coordinates: (x,y) with (0,0) top-left
-    - snake: list of (x,y) with head at index 0
+    - snake: deque of (x,y) with head at index 0
     - walls: hit wall -> game_over True
+    - filling the whole board -> won True (and game_over True)
+
+    Occupancy is kept in a bytearray (one byte per cell, index y*grid_size+x) and
+    free cells in an array with a reverse index, so moving, collision checks and
+    food placement are all O(1) regardless of snake length.
     """
-    def __init__(self, grid_size=20):
+    # optional cell -> bool: cells food must avoid (other snakes on a shared board);
+    # a class attribute so games built without __init__ (snapshot.restore) have it too
+    blocked = None
+
+    def __init__(self, grid_size=20, rng=None):
         self.grid_size = grid_size
+        self.rng = rng or random
         self.reset()
 
-    def reset(self):
-        mid = self.grid_size // 2
-        self.snake = [(mid, mid)]
-        self.direction = "RIGHT"
-        self.last_moved_direction = "RIGHT"
-        self.spawn_food()
+    def reset(self, start=None, direction="RIGHT"):
+        """New game with the head on start (default: the centre cell), heading direction."""
+        n = self.grid_size
+        mid = n // 2
+        self.occupied = bytearray(n * n)
+        self.free_cells = list(range(n * n))
+        self.free_pos = list(range(n * n))  # cell -> index in free_cells, -1 if occupied
+        self.snake = collections.deque()
+        self._push_head(start or (mid, mid))
+        self.direction = direction
+        self.last_moved_direction = direction
         self.score = 0
         self.game_over = False
+        self.won = False
+        self.spawn_food()
+
+    def _occupy(self, cell):
+        self.occupied[cell] = 1
+        i = self.free_pos[cell]
+        last = self.free_cells.pop()
+        if last != cell:
+            self.free_cells[i] = last
+            self.free_pos[last] = i
+        self.free_pos[cell] = -1
+
+    def _release(self, cell):
+        self.occupied[cell] = 0
+        self.free_pos[cell] = len(self.free_cells)
+        self.free_cells.append(cell)
+
+    def _push_head(self, pos):
+        self.snake.appendleft(pos)
+        self._occupy(pos[1] * self.grid_size + pos[0])
+
+    def is_occupied(self, x, y):
+        return bool(self.occupied[y * self.grid_size + x])
 
     def spawn_food(self):
-        while True:
-            f = (random.randint(0, self.grid_size - 1),
-                 random.randint(0, self.grid_size - 1))
-            if f not in self.snake:
-                self.food = f
-                break
+        """
+        Place food on a random free cell; returns False if the board is full.
+        Cells for which blocked(cell) is true are skipped; if that leaves none,
+        food is None until the next spawn_food().
+        """
+        free = self.free_cells
+        if not free:
+            self.food = None
+            return False
+        cell = free[self.rng.randrange(len(free))]
+        if self.blocked is not None and self.blocked(cell):
+            free = [c for c in free if not self.blocked(c)]
+            if not free:
+                self.food = None
+                return True
+            cell = free[self.rng.randrange(len(free))]
+        self.food = (cell % self.grid_size, cell // self.grid_size)
+        return True
 
     def change_direction(self, new_dir):
         # prevent reversing onto itself immediately
         # Check against the direction we LAST MOVED, not the current buffer
-        opposite = {"UP":"DOWN","DOWN":"UP","LEFT":"RIGHT","RIGHT":"LEFT"}
-        if new_dir != opposite.get(self.last_moved_direction, ""):
+        if new_dir != OPPOSITE.get(self.last_moved_direction, ""):
             self.direction = new_dir
 
     def step(self):
@@ -43,16 +99,10 @@ class SnakeGame:
         # Update last_moved_direction to what we are about to execute
         self.last_moved_direction = self.direction
 
+        dx, dy = MOVES[self.direction]
         head_x, head_y = self.snake[0]
-        if self.direction == "UP":
-            head_y -= 1
-        elif self.direction == "DOWN":
-            head_y += 1
-        elif self.direction == "LEFT":
-            head_x -= 1
-        elif self.direction == "RIGHT":
-            head_x += 1
-
+        head_x += dx
+        head_y += dy
         new_head = (head_x, head_y)
 
         # wall collision
@@ -60,37 +110,22 @@ class SnakeGame:
             self.game_over = True
             return
 
-        # self collision
-        if new_head in self.snake:
-            # Special case: if we are just chasing our tail (which will move), it's safe
-            # But in this simple implementation, we check current snake body.
-            # If we don't eat, tail moves. If new_head == tail, it's safe.
-            if new_head != self.snake[-1]: 
+        # self collision: moving into the tail is safe unless we grow this step
+        eating = new_head == self.food
+        if self.occupied[head_y * self.grid_size + head_x]:
+            if eating or new_head != self.snake[-1]:
                 self.game_over = True
                 return
-            # If we ate food, we grow, so tail doesn't move. Then it IS a collision.
-            # But we handle growth after this check.
-            # Actually, standard logic:
-            # If new_head == food: tail stays. Collision check should include tail.
-            # If new_head != food: tail moves. Collision check should EXCLUDE tail.
-            
-            # Let's refine self-collision logic:
-            if new_head == self.food:
-                 # We will grow, so tail stays. Collision with tail is fatal.
-                 self.game_over = True
-                 return
-            else:
-                 # We will pop tail. Collision with tail is safe.
-                 if new_head != self.snake[-1]:
-                     self.game_over = True
-                     return
 
         # move
-        self.snake.insert(0, new_head)
+        if not eating:
+            tail_x, tail_y = self.snake.pop()
+            self._release(tail_y * self.grid_size + tail_x)
+        self._push_head(new_head)
 
         # food?
-        if new_head == self.food:
+        if eating:
             self.score += 10
-            self.spawn_food()
-        else:
-            self.snake.pop()
+            if not self.spawn_food():
+                self.won = True
+                self.game_over = True
@@ -0,0 +1,286 @@
+# src/snapshot.py
+import argparse
+import collections
+import random
+import struct
+import time
+
+import numpy as np
+
+from snake_game import DIRECTIONS, SnakeGame
+
+VERSION = 1
+SNAPSHOT_MAGIC = b"SNKS"
+LOG_MAGIC = b"SNKL"
+
+# snapshot flags
+GAME_OVER = 1
+WON = 2
+HAS_RNG = 4        # Mersenne Twister state follows the body
+HAS_FREE_ORDER = 8  # free-cell order follows (needed to place future food exactly like the original)
+
+# magic, version, flags, grid_size, direction, last_moved, score, length, head cell, food cell (-1: none)
+_HEADER = struct.Struct("<4sBBHBBIIIi")
+_GAUSS = struct.Struct("<d")
+
+# event log records: one per game step (or reset), fixed size so the log can be memory-mapped
+STEP = 0
+RESET = 1
+ATE = 4  # event flags (with GAME_OVER, WON)
+EVENT_DTYPE = np.dtype([
+    ("t", "<f8"), ("kind", "u1"), ("direction", "u1"), ("flags", "u1"), ("_pad", "u1"),
+    ("head", "<u4"), ("food", "<i4"), ("score", "<u4"), ("length", "<u4"),
+])
+_RECORD = struct.Struct("<dBBBBIiII")
+_LOG_HEADER = struct.Struct("<4sBBHI")  # magic, version, pad, record size, snapshot length
+
+
+def _body_codes(cells, n):
+    """Direction code from each segment to the next one towards the tail."""
+    steps = np.diff(cells)
+    codes = np.empty(len(steps), dtype=np.uint8)
+    codes[steps == -n] = 0  # UP
+    codes[steps == n] = 1   # DOWN
+    codes[steps == -1] = 2  # LEFT
+    codes[steps == 1] = 3   # RIGHT
+    return codes
+
+
+def _pack2(codes):
+    """2-bit codes, four per byte."""
+    padded = np.zeros((len(codes) + 3) // 4 * 4, dtype=np.uint8)
+    padded[:len(codes)] = codes
+    quads = padded.reshape(-1, 4)
+    return (quads[:, 0] | quads[:, 1] << 2 | quads[:, 2] << 4 | quads[:, 3] << 6).astype(np.uint8).tobytes()
+
+
+def _unpack2(data, count):
+    packed = np.frombuffer(data, dtype=np.uint8)
+    quads = np.stack([packed & 3, packed >> 2 & 3, packed >> 4 & 3, packed >> 6 & 3], axis=1)
+    return quads.reshape(-1)[:count]
+
+
+def _cell_dtype(n):
+    return np.dtype("<u2") if n * n <= 0x10000 else np.dtype("<u4")
+
+
+def snapshot(game, exact=True):
+    """
+    Serialize a SnakeGame to bytes:
+    - fixed header: grid size, uint8 direction codes, score, length, head and food cells
+    - body delta-encoded from the head as 2-bit direction codes (4 segments per byte)
+    - exact=True adds the free-cell order and the RNG state so restore() continues
+      the game identically (crash recovery, replays); exact=False is the small
+      form for spectators (a 100-segment snake on 20x20 is ~45 bytes)
+    """
+    n = game.grid_size
+    cells = np.fromiter((y * n + x for x, y in game.snake), dtype=np.int64, count=len(game.snake))
+    flags = (GAME_OVER if game.game_over else 0) | (WON if game.won else 0)
+    food = game.food[1] * n + game.food[0] if game.food is not None else -1
+    parts = [None, _pack2(_body_codes(cells, n))]
+    if exact:
+        flags |= HAS_FREE_ORDER
+        parts.append(struct.pack("<I", len(game.free_cells)))
+        parts.append(np.asarray(game.free_cells, dtype=_cell_dtype(n)).tobytes())
+        state = getattr(game.rng, "getstate", None)
+        if state is not None:
+            version, mt, gauss = state()
+            flags |= HAS_RNG
+            parts.append(np.asarray(mt, dtype="<u4").tobytes())
+            parts.append(_GAUSS.pack(float("nan") if gauss is None else gauss))
+    parts[0] = _HEADER.pack(SNAPSHOT_MAGIC, VERSION, flags, n, DIRECTIONS.index(game.direction),
+                            DIRECTIONS.index(game.last_moved_direction), game.score, len(cells),
+                            int(cells[0]), food)
+    return b"".join(parts)
+
+
+def restore(data, rng=None):
+    """
+    SnakeGame from snapshot() bytes. With an exact snapshot the RNG state is
+    loaded into `rng` (a new random.Random by default); otherwise food after
+    the next meal depends on `rng`.
+    """
+    magic, version, flags, n, direction, last_moved, score, length, head, food = _HEADER.unpack_from(data)
+    if magic != SNAPSHOT_MAGIC or version != VERSION:
+        raise ValueError(f"not a snake snapshot (version {VERSION})")
+    offset = _HEADER.size
+    body_bytes = (length - 1 + 3) // 4
+    codes = _unpack2(data[offset:offset + body_bytes], length - 1)
+    offset += body_bytes
+    step = np.array([-n, n, -1, 1], dtype=np.int64)
+    cells = np.full(length, head, dtype=np.int64)
+    if length > 1:
+        cells[1:] += np.cumsum(step[codes])
+
+    game = SnakeGame.__new__(SnakeGame)
+    game.grid_size = n
+    game.rng = rng if rng is not None else random.Random()
+    game.occupied = bytearray(n * n)
+    body = cells.tolist()
+    for cell in body:
+        game.occupied[cell] = 1
+    game.snake = collections.deque((c % n, c // n) for c in body)
+
+    if flags & HAS_FREE_ORDER:
+        (count,) = struct.unpack_from("<I", data, offset)
+        offset += 4
+        dtype = _cell_dtype(n)
+        free = np.frombuffer(data, dtype=dtype, count=count, offset=offset).tolist()
+        offset += count * dtype.itemsize
+    else:
+        free = [c for c in range(n * n) if not game.occupied[c]]
+    game.free_cells = free
+    game.free_pos = [-1] * (n * n)
+    for i, cell in enumerate(free):
+        game.free_pos[cell] = i
+
+    if flags & HAS_RNG:
+        mt = tuple(np.frombuffer(data, dtype="<u4", count=625, offset=offset).tolist())
+        offset += 625 * 4
+        (gauss,) = _GAUSS.unpack_from(data, offset)
+        game.rng.setstate((3, mt, None if gauss != gauss else gauss))
+
+    game.direction = DIRECTIONS[direction]
+    game.last_moved_direction = DIRECTIONS[last_moved]
+    game.score = score
+    game.food = (food % n, food // n) if food >= 0 else None
+    game.game_over = bool(flags & GAME_OVER)
+    game.won = bool(flags & WON)
+    return game
+
+
+def encode_event(game, kind=STEP, flags=0, t=0.0):
+    """One EVENT_DTYPE record (bytes) describing game right after a step or reset."""
+    n = game.grid_size
+    hx, hy = game.snake[0]
+    food = game.food[1] * n + game.food[0] if game.food is not None else -1
+    flags |= (GAME_OVER if game.game_over else 0) | (WON if game.won else 0)
+    return _RECORD.pack(t, kind, DIRECTIONS.index(game.last_moved_direction), flags, 0,
+                        hy * n + hx, food, game.score, len(game.snake))
+
+
+def apply_event(game, record):
+    """
+    Apply a STEP record from encode_event() to a mirror of the game that
+    produced it: moves head and tail, food, score and flags. The free-cell
+    lists are not maintained, so the mirror is for display (spectators), not
+    for stepping further.
+    """
+    _, kind, direction, flags, _, head, food, score, length = _RECORD.unpack(record)
+    n = game.grid_size
+    snake, occupied = game.snake, game.occupied
+    if not flags & GAME_OVER or flags & WON:  # a fatal step leaves the snake where it was
+        while len(snake) >= length:  # tail moves out before the head moves in
+            x, y = snake.pop()
+            occupied[y * n + x] = 0
+        snake.appendleft((head % n, head // n))
+        occupied[head] = 1
+    game.last_moved_direction = game.direction = DIRECTIONS[direction]
+    game.food = (food % n, food // n) if food >= 0 else None
+    game.score = score
+    game.game_over = bool(flags & GAME_OVER)
+    game.won = bool(flags & WON)
+    return game
+
+
+class EventLog:
+    """
+    Append-only per-step game log:
+    - header with an exact snapshot() of the game when the log was opened
+    - then one fixed-size EVENT_DTYPE record per step (direction moved, ate /
+      game-over flags, head, food, score, length) or per reset
+    The file is flushed every flush_every records, so a crash loses at most that
+    many steps; records are read back without parsing via np.memmap (load_log()).
+    Pass record as GameClock's after_step and reset() when the game restarts.
+    """
+    def __init__(self, path, game, flush_every=32, clock=time.monotonic):
+        self.path = path
+        self.flush_every = flush_every
+        self.clock = clock
+        self.count = 0
+        self._last_score = game.score
+        self._file = open(path, "wb")
+        snap = snapshot(game, exact=True)
+        header = _LOG_HEADER.pack(LOG_MAGIC, VERSION, 0, EVENT_DTYPE.itemsize, len(snap)) + snap
+        self._file.write(header + bytes(-len(header) % 8))  # records start 8-byte aligned
+
+    def _write(self, game, kind, flags):
+        self._file.write(encode_event(game, kind, flags, self.clock()))
+        self.count += 1
+        if self.count % self.flush_every == 0:
+            self._file.flush()
+
+    def record(self, game):
+        """after_step hook: log the step the game just took."""
+        ate = ATE if game.score != self._last_score else 0
+        self._last_score = game.score
+        self._write(game, STEP, ate)
+
+    def reset(self, game):
+        """Log a game.reset() (call after resetting)."""
+        self._last_score = game.score
+        self._write(game, RESET, 0)
+
+    def close(self):
+        self._file.close()
+
+
+def load_log(path):
+    """Return (SnakeGame at the start of the log, memory-mapped EVENT_DTYPE records)."""
+    with open(path, "rb") as f:
+        magic, version, _, record_size, snap_len = _LOG_HEADER.unpack(f.read(_LOG_HEADER.size))
+        if magic != LOG_MAGIC or version != VERSION or record_size != EVENT_DTYPE.itemsize:
+            raise ValueError(f"{path}: not a snake event log (version {VERSION})")
+        game = restore(f.read(snap_len))
+    offset = _LOG_HEADER.size + snap_len
+    offset += -offset % 8
+    size = (_file_size(path) - offset) // EVENT_DTYPE.itemsize
+    if size == 0:
+        return game, np.zeros(0, dtype=EVENT_DTYPE)
+    return game, np.memmap(path, dtype=EVENT_DTYPE, mode="r", offset=offset, shape=(size,))
+
+
+def _file_size(path):
+    with open(path, "rb") as f:
+        f.seek(0, 2)
+        return f.tell()
+
+
+def replay_log(path, upto=None):
+    """
+    Re-run a log from its initial snapshot and check every record against the
+    replayed game. Returns (game, steps replayed); raises ValueError on a mismatch.
+    Also the crash-recovery path: the returned game is where the log left off.
+    """
+    game, events = load_log(path)
+    n = game.grid_size
+    events = events[:upto]
+    for i, (kind, direction, head, score) in enumerate(zip(events["kind"].tolist(), events["direction"].tolist(),
+                                                           events["head"].tolist(), events["score"].tolist())):
+        if kind == RESET:
+            game.reset()
+        else:
+            game.change_direction(DIRECTIONS[direction])
+            game.step()
+        hx, hy = game.snake[0]
+        if hy * n + hx != head or game.score != score:
+            raise ValueError(f"{path}: replay diverges at record {i}")
+    return game, len(events)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Inspect or verify a snake event log (main.py --event-log).")
+    parser.add_argument("log")
+    args = parser.parse_args()
+
+    game, events = load_log(args.log)
+    print(f"grid {game.grid_size}x{game.grid_size}, {len(events)} records, "
+          f"{int((events['kind'] == RESET).sum())} resets, {int((events['flags'] & ATE).astype(bool).sum())} foods")
+    t0 = time.perf_counter()
+    game, steps = replay_log(args.log)
+    elapsed = time.perf_counter() - t0
+    print(f"replayed {steps} records in {elapsed:.3f}s: OK, final score {game.score}, length {len(game.snake)}")
+
+
+if __name__ == "__main__":
+    main()
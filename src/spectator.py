@@ -0,0 +1,289 @@
+# src/spectator.py
+import argparse
+import asyncio
+import collections
+import json
+import struct
+import threading
+import time
+
+from snapshot import ATE, STEP, apply_event, encode_event, restore, snapshot
+
+# wire format: length-prefixed messages over plain TCP
+# u32 payload length, u8 kind, payload
+KEYFRAME = 0  # payload: snapshot(game, exact=False)
+STEP_EVENT = 1  # payload: one snapshot.encode_event() record
+METRICS = 2  # payload: JSON object
+_FRAME = struct.Struct("<IB")
+
+
+def _message(kind, payload):
+    return _FRAME.pack(len(payload), kind) + payload
+
+
+class _Subscriber:
+    """Per-connection outbox; overflowing it drops the backlog and forces a resync."""
+    def __init__(self, limit):
+        self.limit = limit
+        self.queue = collections.deque()
+        self.wake = asyncio.Event()
+        self.resync = False
+
+    def push(self, message):
+        """Queue message; returns False if the outbox overflowed instead."""
+        self.wake.set()
+        if len(self.queue) >= self.limit:
+            self.queue.clear()
+            self.resync = True
+            return False
+        self.queue.append(message)
+        return True
+
+
+class SpectatorServer:
+    """
+    Streams a live game to spectators over TCP from an asyncio loop on its own thread.
+    - record(game) / reset(game) are the GameSession observer hooks; they only
+      encode a 28-byte step record (a compact keyframe every keyframe_every steps
+      and on reset) and hand it to the server thread, so the game loop never
+      waits on the network
+    - subscribers first get the newest keyframe plus the steps since, then
+      every step as it happens
+    - backpressure: each subscriber has its own outbox of at most queue_size
+      messages; a subscriber that falls behind has its backlog dropped and is
+      resynced from the next keyframe state instead of stalling anyone else
+    - every metrics_interval seconds, metrics() (e.g. FrameProfiler.summary)
+      and self.info are sent as JSON; metrics() runs on the server thread
+    """
+    def __init__(self, host="127.0.0.1", port=8765, queue_size=256, keyframe_every=64,
+                 metrics=None, metrics_interval=1.0):
+        self.host = host
+        self.port = port
+        self.queue_size = queue_size
+        self.keyframe_every = keyframe_every
+        self.metrics = metrics
+        self.metrics_interval = metrics_interval
+        self.info = {}  # extra values for the metrics messages, set from any thread
+        self.sent = 0
+        self.resyncs = 0
+        self.error = None
+        self._steps = 0
+        self._last_score = 0
+        self._inbox = collections.deque()  # game thread -> server thread
+        self._pending = False
+        self._loop = None
+        self._stop = None
+        self._started = threading.Event()
+        self._thread = None
+        self._keyframe = None
+        self._since = []  # step messages since the keyframe
+        self._subscribers = set()
+        self._tasks = set()
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name="spectator", daemon=True)
+        self._thread.start()
+        self._started.wait()
+        if self.error is not None:
+            raise self.error
+        return self
+
+    def stop(self):
+        if self._loop is not None and self._thread.is_alive():
+            self._loop.call_soon_threadsafe(self._stop.set)
+            self._thread.join(timeout=2.0)
+
+    @property
+    def subscribers(self):
+        return len(self._subscribers)
+
+    # --- game loop side ---
+
+    def reset(self, game):
+        """Observer hook: publish a keyframe (new game, or the initial state)."""
+        self._last_score = game.score
+        self._publish(_message(KEYFRAME, snapshot(game, exact=False)), True)
+
+    def record(self, game):
+        """Observer hook (GameClock after_step): publish the step just taken."""
+        self._steps += 1
+        if self._steps % self.keyframe_every == 0:
+            self.reset(game)
+            return
+        ate = ATE if game.score != self._last_score else 0
+        self._last_score = game.score
+        self._publish(_message(STEP_EVENT, encode_event(game, STEP, ate, time.monotonic())), False)
+
+    def _publish(self, message, keyframe):
+        self._inbox.append((keyframe, message))
+        # wake the loop once per batch instead of once per message
+        if not self._pending and self._loop is not None:
+            self._pending = True
+            self._loop.call_soon_threadsafe(self._drain)
+
+    # --- server thread ---
+
+    def _run(self):
+        try:
+            asyncio.run(self._serve())
+        except Exception as e:  # bind failure etc.: reported by start()
+            self.error = e
+            self._started.set()
+
+    async def _serve(self):
+        self._stop = asyncio.Event()
+        server = await asyncio.start_server(self._handle, self.host, self.port)
+        self.port = server.sockets[0].getsockname()[1]
+        self._loop = asyncio.get_running_loop()
+        self._started.set()
+        metrics = asyncio.create_task(self._send_metrics())
+        await self._stop.wait()
+        metrics.cancel()
+        server.close()
+        for task in list(self._tasks):
+            task.cancel()
+        await asyncio.gather(metrics, *self._tasks, return_exceptions=True)
+        await server.wait_closed()
+
+    def _drain(self):
+        self._pending = False
+        inbox = self._inbox
+        while inbox:
+            keyframe, message = inbox.popleft()
+            if keyframe:
+                self._keyframe = message
+                self._since = []
+            else:
+                self._since.append(message)
+            self._broadcast(message)
+
+    def _broadcast(self, message):
+        for sub in self._subscribers:
+            if not sub.push(message):
+                self.resyncs += 1
+
+    async def _send_metrics(self):
+        while True:
+            await asyncio.sleep(self.metrics_interval)
+            data = dict(self.metrics()) if self.metrics is not None else {}
+            data.update(self.info)
+            data["spectators"] = {"subscribers": len(self._subscribers), "sent": self.sent, "resyncs": self.resyncs}
+            self._broadcast(_message(METRICS, json.dumps(data).encode()))
+
+    async def _handle(self, reader, writer):
+        self._tasks.add(asyncio.current_task())
+        sub = _Subscriber(self.queue_size)
+        sub.resync = self._keyframe is not None  # late joiner: start from the keyframe
+        sub.wake.set()
+        self._subscribers.add(sub)
+        try:
+            while True:
+                await sub.wake.wait()
+                sub.wake.clear()
+                if sub.resync:
+                    sub.resync = False
+                    sub.queue.clear()
+                    if self._keyframe is not None:
+                        sub.queue.append(self._keyframe)
+                        sub.queue.extend(self._since)
+                batch = list(sub.queue)
+                sub.queue.clear()
+                if batch:
+                    writer.write(b"".join(batch))
+                    self.sent += len(batch)
+                    await writer.drain()  # the slow part; the game thread never waits on it
+        except (ConnectionError, asyncio.CancelledError):
+            pass
+        finally:
+            self._subscribers.discard(sub)
+            self._tasks.discard(asyncio.current_task())
+            writer.close()
+
+
+class SpectatorClient:
+    """
+    Mirror of a SpectatorServer's game, for testing and simple viewers.
+    apply(kind, payload) updates self.game (a restored SnakeGame for display)
+    and self.metrics.
+    """
+    def __init__(self):
+        self.game = None
+        self.metrics = {}
+        self.keyframes = 0
+        self.steps = 0
+
+    def apply(self, kind, payload):
+        if kind == KEYFRAME:
+            self.game = restore(payload)
+            self.keyframes += 1
+        elif kind == STEP_EVENT and self.game is not None:
+            apply_event(self.game, payload)
+            self.steps += 1
+        elif kind == METRICS:
+            self.metrics = json.loads(payload)
+
+    async def run(self, host, port, on_message=None, delay=0.0):
+        """Read messages until the server closes; delay (s) per message simulates a slow spectator."""
+        reader, writer = await asyncio.open_connection(host, port)
+        try:
+            while True:
+                try:
+                    header = await reader.readexactly(_FRAME.size)
+                except asyncio.IncompleteReadError:
+                    return
+                length, kind = _FRAME.unpack(header)
+                self.apply(kind, await reader.readexactly(length))
+                if on_message is not None:
+                    on_message(self, kind)
+                if delay:
+                    await asyncio.sleep(delay)
+        finally:
+            writer.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Watch a game streamed with main.py --spectate.")
+    parser.add_argument("address", nargs="?", default="127.0.0.1:8765", help="HOST:PORT")
+    parser.add_argument("--view", action="store_true", help="draw the board in a window")
+    parser.add_argument("--delay", type=float, default=0.0,
+                        help="seconds to sleep per message, to test backpressure with a slow spectator")
+    args = parser.parse_args()
+    host, _, port = args.address.rpartition(":")
+
+    ui = None
+    if args.view:
+        import cv2
+        import numpy as np
+        from ui_overlay import UIOverlay
+        ui = UIOverlay(ox=20, oy=80, cell_size=20)
+        canvas = None
+
+    def on_message(client, kind):
+        nonlocal canvas
+        game = client.game
+        if kind == METRICS:
+            fps = client.metrics.get("fps", "--")
+            spectators = client.metrics["spectators"]
+            print(f"score {game.score if game else 0}  length {len(game.snake) if game else 0}  fps {fps}  "
+                  f"subscribers {spectators['subscribers']}  resyncs {spectators['resyncs']}")
+        elif ui is not None and game is not None:
+            size = game.grid_size * ui.cell_size
+            if canvas is None or canvas.shape[1] != size + 40:
+                canvas = np.zeros((size + 100, size + 40, 3), dtype=np.uint8)
+            canvas[:] = 0
+            ui.draw_header(canvas, game.score)
+            ui.draw_game_area(canvas, game.grid_size)
+            ui.draw_snake(canvas, game)
+            cv2.imshow("Finger Snake (spectator)", canvas)
+            cv2.waitKey(1)
+
+    client = SpectatorClient()
+    try:
+        asyncio.run(client.run(host or "127.0.0.1", int(port), on_message, args.delay))
+    except KeyboardInterrupt:
+        pass
+    print(f"{client.keyframes} keyframes, {client.steps} steps received")
+
+
+if __name__ == "__main__":
+    main()
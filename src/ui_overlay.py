@@ -1,5 +1,8 @@
 # src/ui_overlay.py
 import cv2
+import numpy as np
+
+from render_cache import TextCache, SnakeLayer, circle_sprite
 
 BTN_W, BTN_H = 160, 64
 BTN_GAP = 20
@@ -10,13 +13,21 @@ class UIButtonEvents:
     EXIT = 2
 
 class UIOverlay:
-    def __init__(self, ox=20, oy=20, cell_size=20):
+    def __init__(self, ox=20, oy=20, cell_size=20, snake_color=(0, 255, 100)):
         self.ox = ox
         self.oy = oy
         self.cell_size = cell_size
         self.mouse = {"x": None, "y": None, "clicked": False}
+        self.pointer = None  # fingertip (x, y) while a hand is shown on the game-over screen
+        self._pinching = False
         self.restart_rect = None
         self.exit_rect = None
+        self._board_key = None
+        self._board = None
+        self.snake_color = snake_color
+        self.text = TextCache()
+        self._snake_layer = None
+        self._food_sprite = None
 
     def mouse_callback(self, event, x, y, flags, param):
         if event == cv2.EVENT_LBUTTONDOWN:
@@ -24,27 +35,88 @@ class UIOverlay:
         if event == cv2.EVENT_LBUTTONUP:
             self.mouse["clicked"] = False
 
-    def draw_game_area(self, frame, grid_size):
+    def hand_pointer(self, point, pinching, click=True):
+        """
+        Fingertip as a pointer, fed with every hand result: a pinch starting
+        while `click` is set clicks at the fingertip, so check_button_click()
+        sees it like a mouse click. A pinch already held when click turns on
+        does not count.
+        """
+        self.pointer = point
+        if click and pinching and not self._pinching and point is not None:
+            self.mouse["x"], self.mouse["y"] = point
+        self._pinching = pinching
+
+    def _board_layer(self, frame_shape, grid_size):
+        """
+        Pre-rendered board (border + grid lines) and its mask, clipped to the frame.
+        Rebuilt only when the frame size or the board layout changes.
+        """
+        key = (frame_shape[0], frame_shape[1], self.ox, self.oy, grid_size, self.cell_size)
+        if key == self._board_key:
+            return self._board
+
+        h, w = frame_shape[:2]
         ox, oy = self.ox, self.oy
         cell = self.cell_size
         grid_w = grid_size * cell
         grid_h = grid_size * cell
 
-        # darken area
-        overlay = frame.copy()
-        cv2.rectangle(overlay, (ox, oy), (ox + grid_w, oy + grid_h), (0, 0, 0), -1)
-        frame = cv2.addWeighted(overlay, 0.35, frame, 0.65, 0)
+        # draw everything on a small canvas covering the board (+ border thickness)
+        pad = 2
+        color = np.zeros((grid_h + 2 * pad + 1, grid_w + 2 * pad + 1, 3), dtype=np.uint8)
+        mask = np.zeros(color.shape[:2], dtype=np.uint8)
+        for canvas, border_col, line_col in ((color, (255, 255, 0), (50, 50, 50)), (mask, 255, 255)):
+            cv2.rectangle(canvas, (pad, pad), (pad + grid_w, pad + grid_h), border_col, 3) # Cyan border
+            for i in range(grid_size + 1):
+                x = pad + i * cell
+                cv2.line(canvas, (x, pad), (x, pad + grid_h), line_col, 1)
+                y = pad + i * cell
+                cv2.line(canvas, (pad, y), (pad + grid_w, y), line_col, 1)
+
+        # clip canvas and darkened area to the frame
+        x0, y0 = max(0, ox - pad), max(0, oy - pad)
+        x1, y1 = min(w, ox + grid_w + pad + 1), min(h, oy + grid_h + pad + 1)
+        cx0, cy0 = x0 - (ox - pad), y0 - (oy - pad)
+        roi = (slice(y0, y1), slice(x0, x1))
+        color = color[cy0:cy0 + (y1 - y0), cx0:cx0 + (x1 - x0)]
+        mask = mask[cy0:cy0 + (y1 - y0), cx0:cx0 + (x1 - x0)].copy()
+        dark = (slice(max(0, oy), min(h, oy + grid_h + 1)), slice(max(0, ox), min(w, ox + grid_w + 1)))
+
+        self._board_key = key
+        self._board = (roi, dark, color.copy(), mask)
+        return self._board
+
+    def draw_game_area(self, frame, grid_size):
+        roi, dark, color, mask = self._board_layer(frame.shape, grid_size)
+
+        # darken area (same as blending 35% black over it), in place on the board ROI only
+        area = frame[dark]
+        if area.size:
+            cv2.convertScaleAbs(area, dst=area, alpha=0.65)
 
-        # border
-        cv2.rectangle(frame, (ox, oy), (ox + grid_w, oy + grid_h), (255, 255, 0), 3) # Cyan border
+        # border + grid lines from the cached layer
+        target = frame[roi]
+        if target.size:
+            cv2.copyTo(color, mask, target)
 
-        # grid lines
-        for i in range(grid_size + 1):
-            x = ox + i * cell
-            cv2.line(frame, (x, oy), (x, oy + grid_h), (50, 50, 50), 1)
-            y = oy + i * cell
-            cv2.line(frame, (ox, y), (ox + grid_w, y), (50, 50, 50), 1)
+        return frame
 
+    def draw_snake(self, frame, game):
+        """
+        Draw snake and food on the board. The body comes from a cached layer that
+        is updated only for cells that changed since the last frame.
+        """
+        layer = self._snake_layer
+        if layer is None or layer.grid_size != game.grid_size or layer.cell_size != self.cell_size:
+            layer = self._snake_layer = SnakeLayer(game.grid_size, self.cell_size, self.snake_color)
+            self._food_sprite = circle_sprite(self.cell_size, self.cell_size // 2 - 2, (0, 100, 255))
+        layer.sync(game.occupied)
+        layer.blit(frame, self.ox, self.oy)
+
+        if game.food is not None:
+            fx, fy = game.food
+            self._food_sprite.blit(frame, self.ox + fx * self.cell_size, self.oy + fy * self.cell_size)
         return frame
 
     def draw_header(self, frame, score=0, elapsed_time=0):
@@ -57,54 +129,56 @@ class UIOverlay:
         font = cv2.FONT_HERSHEY_SIMPLEX
         scale = 1.0
         thick = 2
-        (tw, th), _ = cv2.getTextSize(title, font, scale, thick)
-        cv2.putText(frame, title, (w//2 - tw//2, 45), font, scale, (0, 255, 255), thick)
+        tw, th = self.text.text_size(title, font, scale, thick)
+        self.text.put(frame, title, (w//2 - tw//2, 45), font, scale, (0, 255, 255), thick)
         
         # Score - Right aligned
         score_text = f"Score: {score}"
-        (sw, sh), _ = cv2.getTextSize(score_text, font, 0.8, 2)
-        cv2.putText(frame, score_text, (w - sw - 20, 45), font, 0.8, (255, 255, 255), 2)
+        sw, sh = self.text.text_size(score_text, font, 0.8, 2)
+        self.text.put(frame, score_text, (w - sw - 20, 45), font, 0.8, (255, 255, 255), 2)
         
         # Timer - Left aligned
         minutes = int(elapsed_time // 60)
         seconds = int(elapsed_time % 60)
         timer_text = f"Time: {minutes:02}:{seconds:02}"
-        cv2.putText(frame, timer_text, (20, 45), font, 0.8, (255, 255, 255), 2)
+        self.text.put(frame, timer_text, (20, 45), font, 0.8, (255, 255, 255), 2)
         
         return frame
 
-    def draw_countdown(self, frame, remaining):
+    def draw_countdown(self, frame, remaining, status=None):
         h, w, _ = frame.shape
         text = f"Starting in: {remaining}s"
         # Center text below header or in header if space allows. 
         # Let's put it just below header or overlaying the board slightly but centered.
         # Actually, let's put it in the center of the screen for visibility
-        cv2.putText(frame, text, (w//2 - 120, h//2),
+        self.text.put(frame, text, (w//2 - 120, h//2),
                     cv2.FONT_HERSHEY_SIMPLEX, 1.2, (0, 255, 255), 3)
+        # startup progress ("Starting camera...", "Loading hand model...")
+        if status:
+            self.text.put(frame, status, (w//2 - 120, h//2 + 40),
+                        cv2.FONT_HERSHEY_SIMPLEX, 0.7, (200, 200, 200), 2)
         return frame
 
-    def draw_game_over(self, frame, score=0):
+    def draw_game_over(self, frame, score=0, won=False):
         h, w, _ = frame.shape
         
-        # Semi-transparent overlay
-        overlay = frame.copy()
-        cv2.rectangle(overlay, (0, 0), (w, h), (0, 0, 0), -1)
-        frame = cv2.addWeighted(overlay, 0.7, frame, 0.3, 0)
+        # Semi-transparent overlay (70% black), scaled in place
+        cv2.convertScaleAbs(frame, dst=frame, alpha=0.3)
 
         # Game Over Text
-        text = "GAME OVER"
+        text = "YOU WIN" if won else "GAME OVER"
         font = cv2.FONT_HERSHEY_SIMPLEX
         scale = 2.0
         thick = 5
-        (tw, th), _ = cv2.getTextSize(text, font, scale, thick)
+        tw, th = self.text.text_size(text, font, scale, thick)
         cx, cy = w // 2, h // 2
         
-        cv2.putText(frame, text, (cx - tw // 2, cy - 80), font, scale, (0, 0, 255), thick)
+        self.text.put(frame, text, (cx - tw // 2, cy - 80), font, scale, (0, 255, 0) if won else (0, 0, 255), thick)
 
         # Final Score
         score_text = f"Final Score: {score}"
-        (sw, sh), _ = cv2.getTextSize(score_text, font, 1.0, 2)
-        cv2.putText(frame, score_text, (cx - sw // 2, cy - 20), font, 1.0, (255, 255, 0), 2)
+        sw, sh = self.text.text_size(score_text, font, 1.0, 2)
+        self.text.put(frame, score_text, (cx - sw // 2, cy - 20), font, 1.0, (255, 255, 0), 2)
 
         # Buttons centered below text
         btn_w, btn_h = 160, 60
@@ -119,15 +193,19 @@ class UIOverlay:
         # Draw Restart Button
         cv2.rectangle(frame, (self.restart_rect[0], self.restart_rect[1]),
                       (self.restart_rect[2], self.restart_rect[3]), (0, 200, 0), -1)
-        cv2.putText(frame, "RESTART", (self.restart_rect[0] + 15, self.restart_rect[1] + 40),
+        self.text.put(frame, "RESTART", (self.restart_rect[0] + 15, self.restart_rect[1] + 40),
                     font, 0.8, (255, 255, 255), 2)
 
         # Draw Exit Button
         cv2.rectangle(frame, (self.exit_rect[0], self.exit_rect[1]),
                       (self.exit_rect[2], self.exit_rect[3]), (0, 0, 200), -1)
-        cv2.putText(frame, "EXIT", (self.exit_rect[0] + 45, self.exit_rect[1] + 40),
+        self.text.put(frame, "EXIT", (self.exit_rect[0] + 45, self.exit_rect[1] + 40),
                     font, 0.8, (255, 255, 255), 2)
 
+        # hand pointer: pinch over a button to press it
+        if self.pointer is not None:
+            cv2.circle(frame, self.pointer, 12, (0, 255, 255) if self._pinching else (255, 255, 255), 2)
+
         return frame
 
     def check_button_click(self):
@@ -150,27 +228,31 @@ class UIOverlay:
 
         return UIButtonEvents.NONE
 
-    def draw_status(self, frame, controller, game, paused, fps):
+    def draw_status(self, frame, controller, game, paused, fps, profile_lines=None):
         ox, oy = self.ox, self.oy
         grid_h = game.grid_size * self.cell_size
 
         status_text = "PAUSED" if paused else ("PLAYING" if not game.game_over else "DEAD")
         status_col = (0, 0, 255) if paused else ((0, 200, 0) if not game.game_over else (0, 0, 200))
 
-        cv2.putText(frame, f"Status: {status_text}", (ox + 10, oy + grid_h + 30),
+        self.text.put(frame, f"Status: {status_text}", (ox + 10, oy + grid_h + 30),
                     cv2.FONT_HERSHEY_SIMPLEX, 0.7, status_col, 2)
 
-        cv2.putText(frame, f"Dir: {controller.last_direction}",
+        self.text.put(frame, f"Dir: {controller.last_direction}",
                     (ox + 200, oy + grid_h + 30),
                     cv2.FONT_HERSHEY_SIMPLEX, 0.7, (180, 50, 50), 2)
 
-        cv2.putText(frame, f"FPS: {fps}", (ox + 420, oy + grid_h + 30),
+        self.text.put(frame, f"FPS: {fps}", (ox + 420, oy + grid_h + 30),
                     cv2.FONT_HERSHEY_SIMPLEX, 0.6, (200, 200, 200), 1)
 
-        cv2.putText(frame, "Show OPEN PALM to pause", (ox + 10, oy + grid_h + 60),
+        self.text.put(frame, "Show OPEN PALM to pause", (ox + 10, oy + grid_h + 60),
                     cv2.FONT_HERSHEY_SIMPLEX, 0.55, (200, 200, 200), 1)
 
-        cv2.putText(frame, "Click RESTART after death", (ox + 10, oy + grid_h + 80),
+        self.text.put(frame, "Pinch or click RESTART after death", (ox + 10, oy + grid_h + 80),
                     cv2.FONT_HERSHEY_SIMPLEX, 0.55, (200, 200, 200), 1)
 
+        # latency HUD (FrameProfiler.hud_lines), top-left below the header
+        for i, line in enumerate(profile_lines or ()):
+            self.text.put(frame, line, (10, 95 + 16 * i), cv2.FONT_HERSHEY_SIMPLEX, 0.4, (0, 255, 255), 1)
+
         return frame